@@ -0,0 +1,33 @@
+import time
+import argparse
+import numpy as np
+from src.game.snake_batch import BatchSnakeEnv
+from src.ai.agent import Agent
+
+def main():
+    """Measures BatchSnakeEnv throughput with random actions."""
+    parser = argparse.ArgumentParser(description="Benchmark BatchSnakeEnv stepping")
+    parser.add_argument('--envs', type=int, default=4096, help="number of boards")
+    parser.add_argument('--steps', type=int, default=500, help="steps per board")
+    parser.add_argument('--states', action='store_true', help="also extract the state of every board each step")
+    args = parser.parse_args()
+
+    env = BatchSnakeEnv(args.envs, seed=0)
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 3, size=(args.steps, args.envs))
+
+    start = time.perf_counter()
+    games = 0
+    for t in range(args.steps):
+        _, dones, _ = env.step(actions[t])
+        if args.states:
+            Agent.get_states(env)
+        games += int(dones.sum())
+    elapsed = time.perf_counter() - start
+
+    transitions = args.envs * args.steps
+    print(f"{args.envs} boards x {args.steps} steps: {transitions / elapsed:,.0f} transitions/s "
+          f"({games} games finished)")
+
+if __name__ == '__main__':
+    main()
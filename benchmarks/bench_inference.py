@@ -0,0 +1,56 @@
+import timeit
+import argparse
+import tempfile
+import numpy as np
+import torch
+from src.game.snake_core import SnakeGameCore, SplitMix64
+from src.ai.agent import Agent
+from src.ai.features import get_state
+
+def collect_states(n):
+    """Plays random moves and returns n states as get_state produces them."""
+    game = SnakeGameCore(rng=SplitMix64(0))
+    agent_rng = np.random.default_rng(0)
+    states = []
+    while len(states) < n:
+        states.append(get_state(game))
+        _, done, _ = game.play_step(int(agent_rng.integers(3)))
+        if done:
+            game.reset()
+    return states
+
+def old_get_action(model, state):
+    """The greedy branch of get_action before the fast path."""
+    final_move = [0, 0, 0]
+    state0 = torch.tensor(state, dtype=torch.float)
+    prediction = model(state0)
+    move = torch.argmax(prediction).item()
+    final_move[move] = 1
+    return final_move
+
+def main():
+    """Measures the latency of one greedy action choice."""
+    parser = argparse.ArgumentParser(description="Benchmark greedy action selection")
+    parser.add_argument('--number', type=int, default=20_000, help="decisions to time")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        agent = Agent(checkpoint_dir=checkpoint_dir)  # Fresh weights, whatever was trained locally
+    agent.n_games = 1_000  # Past the exploration schedule: always greedy
+    states = collect_states(1_000)
+
+    def run(fn):
+        i = 0
+        def step():
+            nonlocal i
+            fn(states[i % len(states)])
+            i += 1
+        return timeit.timeit(step, number=args.number) / args.number * 1e6
+
+    old_us = run(lambda state: old_get_action(agent.model, state))
+    new_us = run(agent.best_action)
+    print(f"get_action before: {old_us:.1f} us per decision")
+    print(f"best_action:       {new_us:.1f} us per decision ({old_us / new_us:.1f}x)")
+
+if __name__ == '__main__':
+    main()
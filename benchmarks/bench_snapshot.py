@@ -0,0 +1,40 @@
+import timeit
+import argparse
+from src.game.snake_core import SnakeGameCore, SplitMix64, RIGHT, LEFT
+
+def grow(game, length):
+    """Feeds the snake along a serpentine path until it reaches the given length."""
+    straight, right, left = [1, 0, 0], [0, 1, 0], [0, 0, 1]
+    while len(game.snake) < length:
+        x, y = game.cell_xy(game.head)
+        if game.direction == RIGHT:
+            action = right if x == game.cols - 1 else straight
+        elif game.direction == LEFT:
+            action = left if x == 0 else straight
+        else:  # Went down one row; turn back along it
+            action = right if x == game.cols - 1 else left
+        # Look ahead to find the cell the move lands on, then put food there
+        before = game.snapshot()
+        game.play_step(action)
+        target = game.head
+        game.restore(before)
+        game.food = target
+        game.play_step(action)
+
+def main():
+    """Measures SnakeGameCore.snapshot() and restore() latency."""
+    parser = argparse.ArgumentParser(description="Benchmark game snapshots")
+    parser.add_argument('--length', type=int, default=100, help="snake length")
+    parser.add_argument('--number', type=int, default=100_000, help="calls to time")
+    args = parser.parse_args()
+
+    game = SnakeGameCore(rng=SplitMix64(0))
+    grow(game, args.length)
+    snapshot = game.snapshot()
+
+    snap_us = timeit.timeit(game.snapshot, number=args.number) / args.number * 1e6
+    restore_us = timeit.timeit(lambda: game.restore(snapshot), number=args.number) / args.number * 1e6
+    print(f"length {len(game.snake)}: snapshot {snap_us:.2f} us, restore {restore_us:.2f} us")
+
+if __name__ == '__main__':
+    main()
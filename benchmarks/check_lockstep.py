@@ -0,0 +1,247 @@
+import random
+import argparse
+from collections import namedtuple
+import numpy as np
+from src.game.snake_core import SnakeGameCore, SplitMix64, BLOCK_SIZE, TURN, RIGHT, LEFT, UP, DOWN
+from src.game.snake_batch import BatchSnakeEnv
+from src.ai.features import get_state, get_states
+
+Point = namedtuple('Point', 'x, y')
+
+class ReferenceSnakeGame:
+    """
+    The AI game rules as they were before the packed-cell rewrite: pixel
+    Points, a list body scanned for collisions and one-hot actions. Only the
+    food placement is left out; the caller copies the food of the game under
+    test, since food is now drawn from a different generator.
+    """
+
+    def __init__(self, width=640, height=480, frame_limit_multiplier=500):
+        self.width = width
+        self.height = height
+        self.frame_limit_multiplier = frame_limit_multiplier
+        self.recent_positions = []
+        self.loop_detection_length = 20
+        self.reset()
+
+    def reset(self):
+        self.direction = RIGHT
+        self.head = Point(self.width/2, self.height/2)
+        self.snake = [self.head]
+        self.score = 0
+        self.food = None  # Set by the caller
+        self.frame_iteration = 0
+
+    def play_step(self, action):
+        self.frame_iteration += 1
+        self._move(action)
+        self.snake.insert(0, self.head)
+
+        self.recent_positions.append((self.head.x, self.head.y))
+        if len(self.recent_positions) > self.loop_detection_length:
+            self.recent_positions.pop(0)
+
+        if self.is_collision():
+            return -10, True, self.score
+        if self.score > 10 and self.frame_iteration > self.frame_limit_multiplier * len(self.snake):
+            return -10, True, self.score
+
+        reward = 0
+        if self.head == self.food:
+            self.score += 1
+            reward = 10
+            self.food = None  # Set by the caller
+            self.frame_iteration = 0
+        else:
+            self.snake.pop()
+            if len(self.recent_positions) >= 2:
+                prev_distance = abs(self.recent_positions[-2][0] - self.food.x) + abs(self.recent_positions[-2][1] - self.food.y)
+                curr_distance = abs(self.head.x - self.food.x) + abs(self.head.y - self.food.y)
+                reward = 0.1 if curr_distance < prev_distance else -0.1
+        return reward, False, self.score
+
+    def is_collision(self, pt=None):
+        if pt is None:
+            pt = self.head
+        return pt in self.snake[1:]
+
+    def _move(self, action):
+        clock_wise = [RIGHT, DOWN, LEFT, UP]
+        idx = clock_wise.index(self.direction)
+        if action == [1, 0, 0]:
+            self.direction = clock_wise[idx]
+        elif action == [0, 1, 0]:
+            self.direction = clock_wise[(idx + 1) % 4]
+        else:
+            self.direction = clock_wise[(idx - 1) % 4]
+
+        x, y = self.head
+        if self.direction == RIGHT:
+            x += BLOCK_SIZE
+        elif self.direction == LEFT:
+            x -= BLOCK_SIZE
+        elif self.direction == DOWN:
+            y += BLOCK_SIZE
+        elif self.direction == UP:
+            y -= BLOCK_SIZE
+        self.head = Point(x % self.width, y % self.height)
+
+def reference_state(game):
+    """The 11 features as the agent computed them from pixel Points."""
+    head = game.snake[0]
+    dir_u = game.direction == UP
+    dir_r = game.direction == RIGHT
+    dir_d = game.direction == DOWN
+    dir_l = game.direction == LEFT
+    point_u = Point(head.x, head.y - 20)
+    point_r = Point(head.x + 20, head.y)
+    point_d = Point(head.x, head.y + 20)
+    point_l = Point(head.x - 20, head.y)
+    collision = game.is_collision
+    return [
+        (dir_r and collision(point_r)) or (dir_l and collision(point_l)) or
+        (dir_u and collision(point_u)) or (dir_d and collision(point_d)),
+        (dir_u and collision(point_r)) or (dir_d and collision(point_l)) or
+        (dir_l and collision(point_u)) or (dir_r and collision(point_d)),
+        (dir_d and collision(point_r)) or (dir_u and collision(point_l)) or
+        (dir_r and collision(point_u)) or (dir_l and collision(point_d)),
+        dir_l, dir_r, dir_u, dir_d,
+        game.food.x < head.x, game.food.x > head.x, game.food.y < head.y, game.food.y > head.y,
+    ]
+
+def expect(condition, what, *context):
+    """Raises an AssertionError naming the first quantity that differs."""
+    if not condition:
+        raise AssertionError(f"{what} differs: {context}")
+
+def choose_action(rng, state):
+    """
+    Picks a move that avoids the body and, where it can, heads for the food,
+    so snakes grow long and wrap around the edges. One move in ten is random.
+    """
+    if rng.random() < 0.1:
+        return rng.randrange(3)
+    direction = (LEFT, RIGHT, UP, DOWN)[state[3:7].index(1)]
+    towards_food = {LEFT: state[7], RIGHT: state[8], UP: state[9], DOWN: state[10]}
+    safe = [action for action in range(3) if not state[action]]  # Straight, right, left
+    for action in safe:
+        if towards_food[TURN[direction][action]]:
+            return action
+    return safe[0] if safe else 0
+
+def check_core(seeds, max_steps, frame_limit):
+    """
+    Plays seeded games with SnakeGameCore and ReferenceSnakeGame side by
+    side, comparing rewards, game over flags, scores, bodies and states.
+
+    Returns:
+    Tuple (moves compared, games finished, games that timed out, best score).
+    """
+    moves, games, timeouts, best = 0, 0, 0, 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        game = SnakeGameCore(rng=SplitMix64(seed))
+        game.frame_limit_multiplier = frame_limit
+        reference = ReferenceSnakeGame(frame_limit_multiplier=frame_limit)
+        reference.food = game.to_pixels(game.food)
+        for step in range(max_steps):
+            state = get_state(game).tolist()
+            expect(state == [int(v) for v in reference_state(reference)], "get_state", seed, step)
+            action = choose_action(rng, state)
+            one_hot = [0, 0, 0]
+            one_hot[action] = 1
+            result = game.play_step(action)
+            expect(result == reference.play_step(one_hot), "play_step result", seed, step)
+            moves += 1
+            best = max(best, game.score)
+            if result[1]:
+                timeouts += game.death_cause == "timeout"
+                game.reset()
+                reference.reset()
+                games += 1
+            expect(list(game.snake) == [game.grid.cell(p) for p in reference.snake], "body", seed, step)
+            reference.food = game.to_pixels(game.food)
+    return moves, games, timeouts, best
+
+def check_bitboard(seeds, max_steps):
+    """
+    Plays the same seeded games with and without the bitboard, comparing
+    results, bodies, food and states, and the body mask against the body.
+
+    Returns:
+    Tuple (moves compared, games finished).
+    """
+    moves, games = 0, 0
+    for seed in seeds:
+        rng = random.Random(seed)
+        plain = SnakeGameCore(rng=SplitMix64(seed))
+        game = SnakeGameCore(rng=SplitMix64(seed), bitboard=True)
+        for step in range(max_steps):
+            state = get_state(game).tolist()
+            expect(state == get_state(plain).tolist(), "get_state", seed, step)
+            action = choose_action(rng, state)
+            result = game.play_step(action)
+            expect(result == plain.play_step(action), "play_step result", seed, step)
+            moves += 1
+            if result[1]:
+                game.reset()
+                plain.reset()
+                games += 1
+            expect(list(game.snake) == list(plain.snake) and game.food == plain.food, "body or food", seed, step)
+            expect(game.body_bits == game.bitboard.mask(game.snake), "body mask", seed, step)
+    return moves, games
+
+def check_batch(n_envs, steps, seed, frame_limit):
+    """
+    Steps a small-board BatchSnakeEnv next to one SnakeGameCore per board,
+    comparing rewards, game over flags, scores, bodies and states. The cores
+    take their food from the batch, whose generator differs.
+
+    Returns:
+    Tuple (moves compared, games finished).
+    """
+    env = BatchSnakeEnv(n_envs, width=200, height=160, frame_limit_multiplier=frame_limit, seed=seed)
+    games = [SnakeGameCore(width=200, height=160) for _ in range(n_envs)]
+    for i, game in enumerate(games):
+        game.frame_limit_multiplier = frame_limit
+        game.food = int(env.food[i])
+    rng = np.random.default_rng(seed)
+    finished = 0
+    for step in range(steps):
+        states = get_states(env)
+        for i, game in enumerate(games):
+            expect((states[i] == get_state(game)).all(), "get_state", i, step)
+        actions = rng.choice(3, n_envs, p=[0.8, 0.1, 0.1])
+        rewards, dones, scores = env.step(actions)
+        for i, game in enumerate(games):
+            reward, done, score = game.play_step(int(actions[i]))
+            expect(abs(reward - rewards[i]) < 1e-9 and done == dones[i] and score == scores[i],
+                   "step result", i, step)
+            if done:
+                game.reset()
+                finished += 1
+            else:
+                expect(list(game.snake) == env.snake(i) and game.direction == env.direction[i], "body", i, step)
+            game.food = int(env.food[i])
+    return n_envs * steps, finished
+
+def main():
+    """Checks the optimized game implementations against each other in lockstep."""
+    parser = argparse.ArgumentParser(description="Compare the game implementations move by move")
+    parser.add_argument('--seeds', type=int, default=20, help="seeded games per check")
+    parser.add_argument('--steps', type=int, default=5000, help="moves per seed, and batch steps")
+    parser.add_argument('--envs', type=int, default=64, help="boards in the batch check")
+    parser.add_argument('--frame-limit', type=int, default=3,
+                        help="frame_limit_multiplier of every game, low so that timeouts happen")
+    args = parser.parse_args()
+    seeds = range(args.seeds)
+
+    moves, games, timeouts, best = check_core(seeds, args.steps, args.frame_limit)
+    print(f"core matches the reference rules: {moves} moves, {games} games ({timeouts} timed out), best score {best}")
+    moves, games = check_bitboard(seeds, args.steps)
+    print(f"bitboard matches the core: {moves} moves, {games} games")
+    moves, games = check_batch(args.envs, args.steps, 0, args.frame_limit)
+    print(f"batch env matches the core: {moves} moves, {games} games")
+
+if __name__ == '__main__':
+    main()
@@ -2,46 +2,154 @@ import torch
 import random
 import numpy as np
 import os
-import pygame
 import json
 import datetime
-from collections import deque
-from src.game.snake_ai import SnakeGameAI, Point, RIGHT, LEFT, UP, DOWN
+import argparse
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict, fields, replace
+from src.game.snake_core import SnakeGameCore
+from src.ai.features import get_state, get_states
 from src.ai.model import Linear_QNet, QTrainer
+from src.ai.replay import ReplayBuffer, PrioritizedReplayBuffer
 from src.utils.plotter import plot
 
 # Hyperparameters
 MAX_MEMORY = 100_000  # Maximum size of replay memory
 BATCH_SIZE = 1000  # Size of mini-batches for training
 LR = 0.001  # Learning rate for the Q-learning model
+TABLE_LR = 0.1  # Step size of the Q-table updates (TabularAgent)
 
 # Checkpoint directory
 CHECKPOINT_DIR = "data/checkpoints"
 if not os.path.exists(CHECKPOINT_DIR):
     os.makedirs(CHECKPOINT_DIR)
 
+# Where the record model and checkpoint snapshots go
+MODEL_DIR = "./data/models"
+
+@dataclass
+class TrainConfig:
+    """
+    Settings of a training run. The defaults reproduce the original training loop.
+
+    Update schedule: short_memory is "step" (one single-transition update on
+    every move), "batch" (one update on the last update_every transitions,
+    every update_every moves) or "off". Every update_every moves, a minibatch of
+    replay_batch_size transitions is also replayed when replay_batch_size > 0.
+    At the end of every game a batch of batch_size is replayed as before.
+
+    Exploration: a move is random when randint(0, 200) < epsilon, with
+    epsilon = epsilon_start - epsilon_decay * games played.
+
+    With background_learner, updates run in a separate thread instead (see
+    src.ai.background.BackgroundLearner). It replays minibatches of
+    replay_batch_size (batch_size if 0) back to back, and short_memory only
+    chooses whether each one is preceded by an update on the newest moves.
+    """
+    max_games: int = 1000  # Training stops after this many games
+    max_memory: int = MAX_MEMORY
+    batch_size: int = BATCH_SIZE  # Replay batch at the end of every game
+    lr: float = LR
+    table_lr: float = TABLE_LR  # Step size of the Q-table updates (--tabular only)
+    gamma: float = 0.9  # Discount factor for future rewards
+    hidden_size: int = 256
+    epsilon_start: float = 80  # Exploration at the first game (out of 200)
+    epsilon_decay: float = 1.0  # Drop in epsilon per game played
+    prioritized: bool = False  # Prioritized experience replay
+    target_sync: int = 0  # Hard target network sync every N training steps (see QTrainer)
+    tau: float = 0.0  # Soft target network sync rate (see QTrainer)
+    double: bool = False  # Double DQN targets (needs target_sync or tau)
+    short_memory: str = "step"  # "step", "batch" or "off"
+    update_every: int = 1  # Moves between scheduled updates
+    replay_batch_size: int = 0  # Replay minibatch size for scheduled updates (0: none)
+    background_learner: bool = False  # Train in a background thread while playing
+
+    def __post_init__(self):
+        if self.short_memory not in ("step", "batch", "off"):
+            raise ValueError(f"short_memory must be 'step', 'batch' or 'off', not {self.short_memory!r}")
+        if self.update_every < 1:
+            raise ValueError("update_every must be at least 1")
+
+    @classmethod
+    def load(cls, file_name):
+        """Reads settings from a JSON file; missing keys keep their defaults."""
+        with open(file_name, 'r') as f:
+            settings = json.load(f)
+        known = {field.name for field in fields(cls)}
+        unknown = set(settings) - known
+        if unknown:
+            raise ValueError(f"Unknown training settings: {', '.join(sorted(unknown))}")
+        return cls(**settings)
+
+    def save(self, file_name):
+        """Writes the settings to a JSON file."""
+        with open(file_name, 'w') as f:
+            json.dump(asdict(self), f, indent=2)
+
 class Agent:
     """
     Represents the reinforcement learning agent using deep Q-learning.
     Manages the state, action selection, memory, and training of the agent.
     """
-    def __init__(self):
+    MODEL_FILE = "checkpoint_model.pth"  # Model file inside the checkpoint directory
+    COMPLETED_FILE = "completed_model.pth"  # Written once training reaches its last game
+
+    def __init__(self, config=None, checkpoint_dir=CHECKPOINT_DIR, model_dir=MODEL_DIR):
+        """
+        Args:
+        - config (TrainConfig): Hyperparameters and update schedule (default: TrainConfig()).
+        - checkpoint_dir (str): Directory the training state is loaded from and saved to.
+        - model_dir (str): Directory the record and snapshot models are saved to.
+        """
+        self.config = config if config is not None else TrainConfig()
+        self.checkpoint_dir = checkpoint_dir
+        self.model_dir = model_dir
         self.n_games = 0  # Number of games played
+        self.steps = 0  # Moves seen by observe()
         self.epsilon = 0  # Exploration-exploitation tradeoff parameter
-        self.gamma = 0.9  # Discount factor for future rewards
-        self.memory = deque(maxlen=MAX_MEMORY)  # Replay memory for experience replay
-        self.model = Linear_QNet(11, 256, 3)  # Neural network for Q-value approximation
-        self.trainer = QTrainer(self.model, lr=LR, gamma=self.gamma)  # Q-learning trainer
+        self.gamma = self.config.gamma  # Discount factor for future rewards
+        self.prioritized = self.config.prioritized
+        if self.prioritized:
+            self.memory = PrioritizedReplayBuffer(self.config.max_memory)  # Replay memory weighted by TD error
+        else:
+            self.memory = ReplayBuffer(self.config.max_memory)  # Replay memory for experience replay
+        self._build_model()
         self.total_score = 0  # Track total score for calculating mean
         self.record = 0  # Track record score
+        self.learner = None  # BackgroundLearner while one is running
         
         # Load previous training data if available
         self._try_load_checkpoint()
 
+    def _build_model(self):
+        """Creates the value function and its trainer."""
+        config = self.config
+        self.model = Linear_QNet(11, config.hidden_size, 3)  # Neural network for Q-value approximation
+        self.trainer = QTrainer(self.model, lr=config.lr, gamma=self.gamma, target_sync=config.target_sync,
+                                tau=config.tau, double=config.double)  # Q-learning trainer
+        self._state_input = torch.zeros(11)  # Reused network input for action selection
+
+    def _load_model(self, file_name):
+        """
+        Loads the value function from a file written by _save_model, along
+        with the trainer state (optimizer and target network) saved beside it.
+        """
+        self.model.load_state_dict(torch.load(file_name))
+        trainer_file = os.path.splitext(file_name)[0] + "_trainer.pth"
+        if os.path.exists(trainer_file):
+            self.trainer.load_state_dict(torch.load(trainer_file))
+        else:
+            self.trainer.sync_target()
+
+    def _save_model(self, file_name):
+        """Writes the value function to a file, and the trainer state beside it."""
+        torch.save(self.model.state_dict(), file_name)
+        torch.save(self.trainer.state_dict(), os.path.splitext(file_name)[0] + "_trainer.pth")
+
     def _try_load_checkpoint(self):
         """Tries to load training state from checkpoint files."""
-        checkpoint_file = os.path.join(CHECKPOINT_DIR, "training_state.json")
-        model_file = os.path.join(CHECKPOINT_DIR, "checkpoint_model.pth")
+        checkpoint_file = os.path.join(self.checkpoint_dir, "training_state.json")
+        model_file = os.path.join(self.checkpoint_dir, self.MODEL_FILE)
         
         if os.path.exists(checkpoint_file) and os.path.exists(model_file):
             try:
@@ -54,15 +162,14 @@ class Agent:
                 print(f"Loaded training state: Games={self.n_games}, Record={self.record}")
                 
                 # Load model
-                self.model.load_state_dict(torch.load(model_file))
+                self._load_model(model_file)
                 print("Loaded model state from checkpoint")
                 
                 # Load memory if available (optional, may be large)
-                memory_file = os.path.join(CHECKPOINT_DIR, "memory.pth")
+                memory_file = os.path.join(self.checkpoint_dir, "memory.npz")
                 if os.path.exists(memory_file):
                     try:
-                        loaded_memory = torch.load(memory_file)
-                        self.memory = loaded_memory
+                        self.memory.load(memory_file)
                         print(f"Loaded replay memory with {len(self.memory)} experiences")
                     except Exception as e:
                         print(f"Error loading memory: {e}")
@@ -73,8 +180,31 @@ class Agent:
         
         return False
 
+    def paused(self):
+        """
+        Context manager that holds off background updates, so the model and
+        memory can be saved consistently. Does nothing without a background learner.
+        """
+        return self.learner.paused() if self.learner is not None else nullcontext()
+
+    def start_background_learner(self):
+        """Moves training to a BackgroundLearner thread (see TrainConfig.background_learner)."""
+        from src.ai.background import BackgroundLearner
+        self.learner = BackgroundLearner(self)
+        self.learner.start()
+
+    def stop_background_learner(self):
+        """Stops the background learner, if one is running. Raises the error that stopped it, if any."""
+        learner, self.learner = self.learner, None
+        if learner is not None:
+            learner.stop()
+
     def save_checkpoint(self):
         """Saves the current training state to checkpoint files."""
+        with self.paused():
+            return self._save_checkpoint()
+
+    def _save_checkpoint(self):
         try:
             # Save training stats
             state = {
@@ -84,17 +214,18 @@ class Agent:
                 'timestamp': str(datetime.datetime.now())
             }
             
-            with open(os.path.join(CHECKPOINT_DIR, "training_state.json"), 'w') as f:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(os.path.join(self.checkpoint_dir, "training_state.json"), 'w') as f:
                 json.dump(state, f, indent=2)
             
             # Save model
-            torch.save(self.model.state_dict(), os.path.join(CHECKPOINT_DIR, "checkpoint_model.pth"))
+            self._save_model(os.path.join(self.checkpoint_dir, self.MODEL_FILE))
             
             # Save a regular snapshot to the model folder too
-            self.model.save()
+            self.model.save(model_folder_path=self.model_dir)
             
-            # Optionally save memory (may be large)
-            # torch.save(self.memory, os.path.join(CHECKPOINT_DIR, "memory.pth"))
+            # Save replay memory (one .npz write of the filled part of the buffer)
+            self.memory.save(os.path.join(self.checkpoint_dir, "memory.npz"))
             
             print(f"Checkpoint saved: Games={self.n_games}, Record={self.record}")
             return True
@@ -106,75 +237,48 @@ class Agent:
         """
         Extracts the current state of the game as an 11-dimensional vector.
         The state includes danger information, movement direction, and food location.
+        See src.ai.features.get_state.
         """
-        head = game.snake[0]  # Position of the snake's head
-
-        # Movement directions
-        dir_u = game.direction == UP
-        dir_r = game.direction == RIGHT
-        dir_d = game.direction == DOWN
-        dir_l = game.direction == LEFT
-
-        # Points around the head
-        point_u = Point(head.x, head.y - 20)
-        point_r = Point(head.x + 20, head.y)
-        point_d = Point(head.x, head.y + 20)
-        point_l = Point(head.x - 20, head.y)
-
-        # State representation: Danger, direction, and food location
-        state = [
-            # Danger straight
-            (dir_r and game.is_collision(point_r)) or
-            (dir_l and game.is_collision(point_l)) or
-            (dir_u and game.is_collision(point_u)) or
-            (dir_d and game.is_collision(point_d)),
-
-            # Danger right
-            (dir_u and game.is_collision(point_r)) or
-            (dir_d and game.is_collision(point_l)) or
-            (dir_l and game.is_collision(point_u)) or
-            (dir_r and game.is_collision(point_d)),
-
-            # Danger left
-            (dir_d and game.is_collision(point_r)) or
-            (dir_u and game.is_collision(point_l)) or
-            (dir_r and game.is_collision(point_u)) or
-            (dir_l and game.is_collision(point_d)),
-
-            # Current movement direction
-            dir_l,
-            dir_r,
-            dir_u,
-            dir_d,
-
-            # Food location relative to the head
-            game.food.x < game.head.x,  # Food is left
-            game.food.x > game.head.x,  # Food is right
-            game.food.y < game.head.y,  # Food is up
-            game.food.y > game.head.y  # Food is down
-        ]
-
-        return np.array(state, dtype=int)
+        return get_state(game)
+
+    @staticmethod
+    def get_states(env):
+        """
+        Extracts the 11-dimensional state of every board in a BatchSnakeEnv.
+        See src.ai.features.get_states.
+        """
+        return get_states(env)
 
     def remember(self, state, action, reward, next_state, done):
         """
         Stores a state transition in the replay memory.
+        One-hot actions are stored as their index.
         """
-        self.memory.append((state, action, reward, next_state, done))
+        if np.ndim(action) == 0:  # Python, NumPy or tensor scalar index
+            action = int(action)
+        else:
+            action = int(np.argmax(action))
+        self.memory.append(state, action, reward, next_state, done)
 
-    def train_long_memory(self):
+    def train_long_memory(self, batch_size=None):
         """
         Trains the model using a batch of transitions from the replay memory.
         If memory is smaller than the batch size, trains on the entire memory.
+        With prioritized replay, the batch is weighted and the priorities of the
+        sampled transitions are refreshed from their TD errors.
+
+        Args:
+        - batch_size (int): Transitions to replay (default: config.batch_size).
         """
-        if len(self.memory) > BATCH_SIZE:
-            mini_sample = random.sample(self.memory, BATCH_SIZE)  # Random sample
+        if batch_size is None:
+            batch_size = self.config.batch_size
+        if self.prioritized:
+            batch, weights, idx = self.memory.sample(batch_size)
+            td_errors = self.trainer.train_step(*batch, weights=weights)
+            self.memory.update_priorities(idx, np.asarray(td_errors))
         else:
-            mini_sample = self.memory  # Use entire memory if not enough samples
-
-        # Extract components of the transitions
-        states, actions, rewards, next_states, dones = zip(*mini_sample)
-        self.trainer.train_step(states, actions, rewards, next_states, dones)
+            states, actions, rewards, next_states, dones = self.memory.sample(batch_size)
+            self.trainer.train_step(states, actions, rewards, next_states, dones)
 
     def train_short_memory(self, state, action, reward, next_state, done):
         """
@@ -182,49 +286,157 @@ class Agent:
         """
         self.trainer.train_step(state, action, reward, next_state, done)
 
+    def observe(self, state, action, reward, next_state, done):
+        """
+        Records a move and runs the updates the training schedule calls for
+        (see TrainConfig). With the default schedule this is exactly
+        train_short_memory followed by remember. With a background learner
+        the move is only stored, and the learner thread does the updates.
+        """
+        config = self.config
+        if self.learner is not None:
+            self.learner.remember(state, action, reward, next_state, done)
+            self.steps += 1
+            return
+
+        if config.short_memory == "step":
+            self.train_short_memory(state, action, reward, next_state, done)
+        self.remember(state, action, reward, next_state, done)
+
+        self.steps += 1
+        if self.steps % config.update_every == 0:
+            if config.short_memory == "batch":
+                # The moves since the last update are the newest ones in memory
+                self.trainer.train_step(*self.memory.recent(config.update_every))
+            if config.replay_batch_size > 0:
+                self.train_long_memory(config.replay_batch_size)
+
+    def observe_moves(self, states, actions, rewards, next_states, dones):
+        """
+        Records a run of moves played elsewhere (see src.ai.parallel) and
+        runs the updates the training schedule calls for. The moves arrive
+        together, so "step" and "batch" short-memory updates both become one
+        update on the whole run; replay minibatches are run once per
+        update_every moves as in observe().
+
+        Args:
+        - states, next_states (np.ndarray): Packed state codes (see src.ai.features).
+        - actions (np.ndarray): Action indices.
+        - rewards (np.ndarray): Rewards received.
+        - dones (np.ndarray): Whether each move ended the game.
+        """
+        config = self.config
+        n = len(actions)
+        self.memory.extend(states, actions, rewards, next_states, dones)
+        if config.short_memory != "off":
+            self.trainer.train_step(*self.memory.recent(n))
+
+        n_updates = (self.steps + n) // config.update_every - self.steps // config.update_every
+        self.steps += n
+        if config.replay_batch_size > 0:
+            for _ in range(n_updates):
+                self.train_long_memory(config.replay_batch_size)
+
     def get_action(self, state):
         """
         Selects an action using an epsilon-greedy strategy.
         - Explores with probability proportional to epsilon.
         - Exploits (chooses the best action) otherwise.
+
+        Returns the action one-hot ([straight, right, left]); see
+        get_action_index() for the index alone.
         """
-        self.epsilon = 80 - self.n_games  # Decay epsilon as games progress
         final_move = [0, 0, 0]  # Action format: [straight, right, left]
+        final_move[self.get_action_index(state)] = 1
+        return final_move
+
+    def get_action_index(self, state):
+        """
+        Same epsilon-greedy choice as get_action(), returned as an action
+        index (0 straight, 1 right, 2 left).
+        """
+        self.epsilon = self.config.epsilon_start - self.config.epsilon_decay * self.n_games  # Decay epsilon as games progress
 
         if random.randint(0, 200) < self.epsilon:
-            move = random.randint(0, 2)  # Random action
-            final_move[move] = 1
-        else:
-            state0 = torch.tensor(state, dtype=torch.float)
-            prediction = self.model(state0)  # Predict Q-values for each action
-            move = torch.argmax(prediction).item()  # Select action with max Q-value
-            final_move[move] = 1
+            return random.randint(0, 2)  # Random action
+        return self.best_action(state)
 
-        return final_move
+    def best_action(self, state):
+        """
+        Returns the index of the action with the highest predicted Q-value.
+        Runs without autograd and copies the state into a preallocated input
+        tensor, so a decision allocates no new input.
+        With a background learner, its acting copy of the weights is used.
+        """
+        if self.learner is not None:
+            return self.learner.best_action(state)
+        with torch.inference_mode():
+            self._state_input.copy_(torch.as_tensor(state))
+            return int(self.model(self._state_input).argmax())
 
-def train():
+def check_settings(config, tabular):
+    """
+    Raises a ValueError if a setting the chosen agent ignores was changed
+    from its default: a network-only one (see tabular.NETWORK_SETTINGS)
+    for a Q-table, or table_lr for the network.
+    """
+    from src.ai.tabular import NETWORK_SETTINGS
+    names = NETWORK_SETTINGS if tabular else ("table_lr",)
+    defaults = TrainConfig()
+    ignored = [name for name in names if getattr(config, name) != getattr(defaults, name)]
+    if ignored:
+        agent = "a Q-table" if tabular else "the network"
+        raise ValueError(f"Settings that do not apply to {agent}: {', '.join(ignored)}")
+
+def train(headless=False, tabular=False, config=None, checkpoint_dir=None, model_dir=MODEL_DIR,
+          plot_progress=True):
     """
     Main training loop for the reinforcement learning agent.
     - Trains the agent to play the Snake game.
     - Tracks performance metrics and plots results.
     - Supports saving checkpoints and handling interruptions.
-    - Automatically stops after 1000 games.
+    - Automatically stops after config.max_games games (1000 by default).
+
+    Args:
+    - headless (bool): Run the bare game core without a window, sounds or
+      frame cap. Training then runs as fast as the CPU allows and is stopped
+      with Ctrl+C instead of the keyboard shortcuts.
+    - tabular (bool): Train a TabularAgent (exact Q-table) instead of the network.
+    - config (TrainConfig): Hyperparameters and update schedule (default: TrainConfig()).
+    - checkpoint_dir (str): Where the training state is kept (default: the agent's own).
+    - model_dir (str): Where the record and snapshot models are saved.
+    - plot_progress (bool): Save score plots to data/plots while training.
+
+    Returns:
+    - Agent: The trained agent.
     """
-    # Import pygame for event handling
-    import pygame
-    import datetime
-    
+    if config is None:
+        config = TrainConfig()
+    check_settings(config, tabular)
+
     # Set maximum number of games to train
-    MAX_GAMES = 1000
+    MAX_GAMES = config.max_games
     
-    agent = Agent()  # Initialize the agent
+    agent_dirs = {'model_dir': model_dir}
+    if checkpoint_dir is not None:
+        agent_dirs['checkpoint_dir'] = checkpoint_dir
+    if tabular:
+        from src.ai.tabular import TabularAgent
+        agent = TabularAgent(config=config, **agent_dirs)
+    else:
+        agent = Agent(config=config, **agent_dirs)  # Initialize the agent
+
+    # Log the settings with the run
+    print(f"Training settings: {json.dumps(asdict(config))}")
+    os.makedirs(agent.checkpoint_dir, exist_ok=True)
+    config.save(os.path.join(agent.checkpoint_dir, "train_config.json"))
     
     # Load previous training data for plotting
     plot_scores = []
     plot_mean_scores = []
     
     # Try to load previous plot data if it exists
-    plot_data_file = os.path.join(CHECKPOINT_DIR, "plot_data.json")
+    plot_data_file = os.path.join(agent.checkpoint_dir, "plot_data.json")
     if os.path.exists(plot_data_file):
         try:
             with open(plot_data_file, 'r') as f:
@@ -235,27 +447,39 @@ def train():
         except Exception as e:
             print(f"Error loading plot data: {e}")
     
-    game = SnakeGameAI(record=agent.record)  # Initialize game with loaded record
-    game.avg = agent.total_score / max(1, agent.n_games)  # Calculate average
-    game.iteration = agent.n_games  # Set current iteration
+    if headless:
+        game = SnakeGameCore()  # No display, sounds or frame cap
+    else:
+        # Import pygame and the renderer only when a window is wanted
+        import pygame
+        from src.game.snake_ai import SnakeGameAI
+
+        game = SnakeGameAI(record=agent.record)  # Initialize game with loaded record
+        game.avg = agent.total_score / max(1, agent.n_games)  # Calculate average
+        game.iteration = agent.n_games  # Set current iteration
+
+        # Create fonts with proper error handling
+        try:
+            main_font = pygame.font.Font("assets/fonts/game_over.ttf", 60) 
+            sub_font = pygame.font.Font("assets/fonts/game_over.ttf", 36)
+            small_font = pygame.font.Font("assets/fonts/game_over.ttf", 24)
+        except FileNotFoundError:
+            print("Warning: Font file not found. Using system fonts.")
+            main_font = pygame.font.SysFont("Arial", 60)
+            sub_font = pygame.font.SysFont("Arial", 36)
+            small_font = pygame.font.SysFont("Arial", 24)
     
-    # Time tracking for auto-save
-    last_save_time = datetime.datetime.now()
+    # Time tracking for auto-save and time-to-record
+    session_start = datetime.datetime.now()
+    session_steps = agent.steps
+    last_save_time = session_start
     save_interval = datetime.timedelta(minutes=10)  # Save every 10 minutes
     
-    # Create fonts with proper error handling
-    try:
-        main_font = pygame.font.Font("assets/fonts/game_over.ttf", 60) 
-        sub_font = pygame.font.Font("assets/fonts/game_over.ttf", 36)
-        small_font = pygame.font.Font("assets/fonts/game_over.ttf", 24)
-    except FileNotFoundError:
-        print("Warning: Font file not found. Using system fonts.")
-        main_font = pygame.font.SysFont("Arial", 60)
-        sub_font = pygame.font.SysFont("Arial", 36)
-        small_font = pygame.font.SysFont("Arial", 24)
-    
     print(f"Starting training session. Will train until {MAX_GAMES} games or manual interruption.")
     print(f"Current progress: {agent.n_games}/{MAX_GAMES} games completed")
+
+    if config.background_learner:
+        agent.start_background_learner()
     
     try:
         # Continue training until we reach MAX_GAMES
@@ -263,85 +487,92 @@ def train():
             # Get the current state
             state_old = agent.get_state(game)
 
-            # Decide on an action
-            final_move = agent.get_action(state_old)
+            # Decide on an action (as an index: 0 straight, 1 right, 2 left)
+            final_move = agent.get_action_index(state_old)
 
             # Perform the action and observe the next state and reward
             reward, done, score = game.play_step(final_move)
             state_new = agent.get_state(game)
 
-            # Train the agent on the immediate transition
-            agent.train_short_memory(state_old, final_move, reward, state_new, done)
+            # Store the transition and train on the schedule set by the config
+            agent.observe(state_old, final_move, reward, state_new, done)
 
-            # Store the transition in memory
-            agent.remember(state_old, final_move, reward, state_new, done)
-
-            # Check for keyboard input - FIXED: using pygame.event.get() instead of game.event.get()
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    # Save checkpoint before quitting
-                    agent.save_checkpoint()
+            # Check for keyboard input (only when a window is open)
+            if not headless:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        # Save checkpoint before quitting
+                        agent.save_checkpoint()
                     
-                    # Save plot data
-                    with open(plot_data_file, 'w') as f:
-                        json.dump({
-                            'scores': plot_scores,
-                            'mean_scores': plot_mean_scores
-                        }, f)
+                        # Save plot data
+                        with open(plot_data_file, 'w') as f:
+                            json.dump({
+                                'scores': plot_scores,
+                                'mean_scores': plot_mean_scores
+                            }, f)
                         
-                    pygame.quit()
-                    return
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_s:  # Press 'S' to save
-                        agent.save_checkpoint()
-                        # Add visual feedback when save is triggered with proper font
-                        save_text = sub_font.render('SAVED! Training progress stored.', True, (255, 255, 0))
-                        game.display.blit(save_text, (game.width//2 - save_text.get_width()//2, game.height - 50))
-                        pygame.display.update()
-                        # Wait briefly so the message is visible
-                        pygame.time.wait(1000)
-                    elif event.key == pygame.K_p:  # Press 'P' to pause
-                        paused = True
-                        pause_text = sub_font.render('PAUSED - Press P to continue', True, (255, 255, 255))
-                        game.display.blit(pause_text, (game.width//2 - pause_text.get_width()//2, game.height//2))
-                        pygame.display.update()
+                        pygame.quit()
+                        return agent
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_s:  # Press 'S' to save
+                            agent.save_checkpoint()
+                            # Add visual feedback when save is triggered with proper font
+                            save_text = sub_font.render('SAVED! Training progress stored.', True, (255, 255, 0))
+                            game.display.blit(save_text, (game.width//2 - save_text.get_width()//2, game.height - 50))
+                            pygame.display.update()
+                            # Wait briefly so the message is visible
+                            pygame.time.wait(1000)
+                        elif event.key == pygame.K_p:  # Press 'P' to pause
+                            paused = True
+                            pause_text = sub_font.render('PAUSED - Press P to continue', True, (255, 255, 255))
+                            game.display.blit(pause_text, (game.width//2 - pause_text.get_width()//2, game.height//2))
+                            pygame.display.update()
                         
-                        while paused:
-                            for pause_event in pygame.event.get():
-                                if pause_event.type == pygame.KEYDOWN and pause_event.key == pygame.K_p:
-                                    paused = False
-                                elif pause_event.type == pygame.QUIT:
-                                    agent.save_checkpoint()
-                                    pygame.quit()
-                                    return
-                            pygame.time.wait(100)
+                            while paused:
+                                for pause_event in pygame.event.get():
+                                    if pause_event.type == pygame.KEYDOWN and pause_event.key == pygame.K_p:
+                                        paused = False
+                                    elif pause_event.type == pygame.QUIT:
+                                        agent.save_checkpoint()
+                                        pygame.quit()
+                                        return agent
+                                pygame.time.wait(100)
 
             if done:
                 # Train on long-term memory
                 game.reset()
                 agent.n_games += 1
-                agent.train_long_memory()
+                if agent.learner is None:  # The background learner replays on its own
+                    agent.train_long_memory()
 
                 # Update total score and record
                 agent.total_score += score
                 if score > agent.record:
                     agent.record = score
-                    game.record = agent.record
+                    if not headless:
+                        game.record = agent.record
                     # Save new record immediately
-                    agent.model.save()
+                    with agent.paused():
+                        agent.model.save(model_folder_path=agent.model_dir)
+                    elapsed = (datetime.datetime.now() - session_start).total_seconds()
+                    print(f'New record {score} after {elapsed:.1f}s of this session')
 
-                # Print progress with games remaining
-                print(f'Game {agent.n_games}/{MAX_GAMES} - Score: {score}, Record: {agent.record}')
+                # Print progress with games remaining and training throughput
+                elapsed = (datetime.datetime.now() - session_start).total_seconds()
+                steps_per_second = (agent.steps - session_steps) / max(elapsed, 1e-9)
+                print(f'Game {agent.n_games}/{MAX_GAMES} - Score: {score}, Record: {agent.record}'
+                      f' ({steps_per_second:.0f} steps/s)')
 
                 # Update plots
                 plot_scores.append(score)
                 mean_score = round(agent.total_score / agent.n_games, 2)
-                game.avg = mean_score
-                game.iteration = agent.n_games
+                if not headless:
+                    game.avg = mean_score
+                    game.iteration = agent.n_games
                 plot_mean_scores.append(mean_score)
 
                 # Plot every 10 iterations or when score is good
-                if game.iteration % 10 == 0 or score > 10:
+                if plot_progress and (agent.n_games % 10 == 0 or score > 10):
                     plot(plot_scores, plot_mean_scores)
                 
                 # Auto-save periodically
@@ -374,6 +605,8 @@ def train():
                 'mean_scores': plot_mean_scores
             }, f)
         print("Checkpoint and plot data saved. You can resume later.")
+    finally:
+        agent.stop_background_learner()
     
     # Final save when training is complete
     if agent.n_games >= MAX_GAMES:
@@ -388,8 +621,55 @@ def train():
             }, f)
         
         # Create a special "completed" model file
-        torch.save(agent.model.state_dict(), os.path.join(CHECKPOINT_DIR, "completed_model.pth"))
+        agent._save_model(os.path.join(agent.checkpoint_dir, agent.COMPLETED_FILE))
         print(f"Final model saved after {MAX_GAMES} games of training.")
 
+    return agent
+
 if __name__ == '__main__':
-    train()
+    parser = argparse.ArgumentParser(description="Train the Snake AI agent")
+    parser.add_argument('--headless', action='store_true',
+                        help="train without a window, sounds or frame cap")
+    parser.add_argument('--tabular', action='store_true',
+                        help="learn an exact Q-table instead of the neural network")
+    parser.add_argument('--actors', type=int, metavar='N',
+                        help="play headless games in N actor processes feeding one learner (see src/ai/parallel.py)")
+    parser.add_argument('--config', metavar='FILE',
+                        help="JSON file of training settings (see TrainConfig); flags below override it")
+    parser.add_argument('--prioritized', action='store_true', default=None,
+                        help="replay transitions in proportion to their TD error")
+    parser.add_argument('--target-sync', type=int, metavar='N',
+                        help="bootstrap from a target network copied from the model every N training steps")
+    parser.add_argument('--tau', type=float,
+                        help="soft-update a target network by this rate after every training step")
+    parser.add_argument('--double', action='store_true', default=None,
+                        help="use Double DQN targets (needs --target-sync or --tau)")
+    parser.add_argument('--short-memory', choices=["step", "batch", "off"],
+                        help="single-move updates on every move, batched every --update-every moves, or none")
+    parser.add_argument('--update-every', type=int, metavar='K',
+                        help="moves between scheduled updates")
+    parser.add_argument('--replay-batch', type=int, metavar='B', dest='replay_batch_size',
+                        help="replay a minibatch of B transitions every --update-every moves")
+    parser.add_argument('--background-learner', action='store_true', default=None,
+                        help="train in a background thread while the game keeps playing")
+    args = parser.parse_args()
+
+    config = TrainConfig.load(args.config) if args.config else TrainConfig()
+    overrides = {name: getattr(args, name) for name in ('prioritized', 'target_sync', 'tau', 'double',
+                                                         'short_memory', 'update_every', 'replay_batch_size',
+                                                         'background_learner')
+                 if getattr(args, name) is not None}
+    config = replace(config, **overrides)
+    try:
+        check_settings(config, args.tabular)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.actors:
+        if args.tabular:
+            parser.error("--actors trains the neural network and cannot be combined with --tabular")
+        if config.background_learner:
+            parser.error("--actors already trains while the actors play and cannot be combined with --background-learner")
+        from src.ai.parallel import train_parallel
+        train_parallel(args.actors, config=config)
+    else:
+        train(headless=args.headless, tabular=args.tabular, config=config)
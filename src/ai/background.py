@@ -0,0 +1,123 @@
+import copy
+import threading
+from contextlib import contextmanager
+import numpy as np
+import torch
+
+class BackgroundLearner:
+    """
+    Trains an Agent's network in a background thread while the main thread
+    keeps playing. PyTorch releases the GIL inside its kernels, so most of
+    the learning time overlaps with game stepping.
+
+    The thread replays minibatches from the agent's memory back to back.
+    Before each one it also trains on the moves stored since its last update,
+    unless short_memory is "off". Moves are played with an acting copy of the
+    network, refreshed after every update (double-buffered weights), so a
+    decision never sees a half-applied optimizer step.
+
+    Locks:
+    - memory_lock guards the replay memory (storing, sampling, priorities).
+    - weights_lock guards the acting copy.
+    - train_lock is held for each update; paused() takes it so the model
+      can be saved in a consistent state.
+
+    If an update raises, the thread stops and the error is raised again from
+    the next remember() or stop() call, so training does not go on with
+    frozen weights.
+    """
+
+    def __init__(self, agent):
+        """
+        Args:
+        - agent (Agent): The agent to train; its model, trainer and memory are used in place.
+        """
+        self.agent = agent
+        self.memory_lock = threading.Lock()
+        self.weights_lock = threading.Lock()
+        self.train_lock = threading.Lock()
+        self.acting_model = copy.deepcopy(agent.model)  # Weights the main thread plays with
+        self._state_input = torch.zeros(11)  # Input buffer of best_action, only touched under weights_lock
+        self.new_moves = 0  # Moves stored since the last update
+        self.updates = 0  # Replay updates done so far
+        self.error = None  # Exception that stopped the thread, if any
+        self._stop = threading.Event()
+        self._has_moves = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="learner", daemon=True)
+
+    def start(self):
+        """Starts the learner thread."""
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the learner thread after its current update. Raises the error
+        that stopped the thread, if one did.
+        """
+        self._stop.set()
+        self._has_moves.set()  # Wake it if it is still waiting for the first move
+        self._thread.join()
+        self._check()
+
+    def _check(self):
+        """Raises the error that stopped the learner thread, if any."""
+        if self.error is not None:
+            raise RuntimeError("Background learner failed") from self.error
+
+    @contextmanager
+    def paused(self):
+        """Holds off updates while the block runs."""
+        with self.train_lock:
+            yield
+
+    def remember(self, state, action, reward, next_state, done):
+        """Stores a move in the replay memory for the learner thread."""
+        self._check()
+        with self.memory_lock:
+            self.agent.remember(state, action, reward, next_state, done)
+            self.new_moves += 1
+        self._has_moves.set()
+
+    def best_action(self, state):
+        """
+        Returns the index of the action with the highest Q-value under the acting weights.
+        """
+        with self.weights_lock, torch.inference_mode():
+            self._state_input.copy_(torch.as_tensor(state))
+            return int(self.acting_model(self._state_input).argmax())
+
+    def _run(self):
+        try:
+            self._learn()
+        except Exception as e:
+            self.error = e
+
+    def _learn(self):
+        agent = self.agent
+        config = agent.config
+        batch_size = config.replay_batch_size or config.batch_size
+        self._has_moves.wait()
+
+        while not self._stop.is_set():
+            with self.train_lock:
+                with self.memory_lock:
+                    recent = None
+                    if self.new_moves and config.short_memory != "off":
+                        recent = agent.memory.recent(self.new_moves)
+                    self.new_moves = 0
+                    if agent.prioritized:
+                        batch, weights, idx = agent.memory.sample(batch_size)
+                    else:
+                        batch, weights = agent.memory.sample(batch_size), None
+
+                if recent is not None:
+                    agent.trainer.train_step(*recent)
+                td_errors = agent.trainer.train_step(*batch, weights=weights)
+                if agent.prioritized:
+                    with self.memory_lock:
+                        agent.memory.update_priorities(idx, np.asarray(td_errors))
+
+                with self.weights_lock, torch.no_grad():
+                    for acting, param in zip(self.acting_model.parameters(), agent.model.parameters()):
+                        acting.copy_(param)
+                self.updates += 1
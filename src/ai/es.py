@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import queue
+import argparse
+from dataclasses import dataclass, asdict, fields, replace
+import numpy as np
+import torch
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+from src.ai.model import Linear_QNet
+from src.ai.policy_table import PolicyTable
+from src.ai.evaluate import play_episode
+from src.ai.agent import CHECKPOINT_DIR, MODEL_DIR
+from src.ai.processes import spawn_context
+
+# Theta and the generation count, in a folder of their own since they are not an Agent checkpoint
+ES_CHECKPOINT_DIR = os.path.join(CHECKPOINT_DIR, "es")
+ES_MODEL_FILE = "es_model.pth"  # Record model, saved to the model folder
+
+@dataclass
+class ESConfig:
+    """
+    Settings of an evolution strategies run.
+
+    Every generation evaluates population antithetic pairs of candidates,
+    theta + sigma * eps and theta - sigma * eps, each over the same seeded
+    greedy games. The candidates are ranked by mean score, ties broken by
+    mean return, and theta moves by
+    lr / (population * sigma) * sum((rank+ - rank-) * eps), with the ranks
+    centered on zero. Ranking by return alone would reward circling near
+    the food: the game has no move limit before score 10, so the distance
+    shaping (+0.1 closer, -0.1 further) pays out lap after lap until
+    max_steps.
+    """
+    generations: int = 200
+    population: int = 32  # Antithetic pairs per generation
+    sigma: float = 0.05  # Standard deviation of the perturbations
+    lr: float = 0.03  # Step size of the update
+    episodes: int = 2  # Games per candidate
+    max_steps: int = 1000  # Moves after which a rollout game is cut off
+    hidden_size: int = 256
+    seed: int = 0  # Seeds the initial weights, the perturbations and the games
+
+def perturbation(seed, size):
+    """Returns the Gaussian perturbation drawn from a seed."""
+    return np.random.default_rng(seed).standard_normal(size, dtype=np.float32)
+
+def centered_ranks(scores, returns):
+    """
+    Ranks candidates by score, then return, and scales the ranks to [-0.5, 0.5].
+    """
+    ranks = np.empty(len(scores), dtype=np.float32)
+    ranks[np.lexsort((returns, scores))] = np.arange(len(scores), dtype=np.float32)
+    return ranks / max(len(scores) - 1, 1) - 0.5
+
+def apply_update(theta, seeds, coefficients, config):
+    """
+    Returns theta moved along the perturbations of the given seeds. The
+    learner and every worker run this on the same seeds and coefficients,
+    so they stay in step without exchanging weights.
+    """
+    step = np.zeros_like(theta)
+    for seed, coefficient in zip(seeds, coefficients):
+        step += np.float32(coefficient) * perturbation(seed, theta.size)
+    return theta + np.float32(config.lr / (len(seeds) * config.sigma)) * step
+
+def generation_seeds(config, generation):
+    """
+    Returns the perturbation seeds of a generation and the seeds of the games
+    its candidates play (common to all candidates, so they compete on equal terms).
+    """
+    rng = np.random.default_rng([config.seed, generation])
+    noise_seeds = rng.integers(2**63, size=config.population).tolist()
+    game_seeds = rng.integers(2**63, size=config.episodes).tolist()
+    return noise_seeds, game_seeds
+
+def rollout(model, theta, game_seeds, max_steps):
+    """
+    Plays greedy games with the given weights.
+
+    Returns:
+    Tuple (mean score, mean return, best score, moves played).
+    """
+    with torch.no_grad():
+        vector_to_parameters(torch.from_numpy(theta), model.parameters())
+    actions = PolicyTable.from_model(model).actions
+    scores, moves, _, returns = zip(*(play_episode(actions, seed, max_steps) for seed in game_seeds))
+    return float(np.mean(scores)), float(np.mean(returns)), max(scores), sum(moves)
+
+def initial_theta(config, model_file=None):
+    """
+    Returns the starting weights as a flat vector: those saved in model_file,
+    or a fresh Linear_QNet seeded with config.seed.
+    """
+    torch.manual_seed(config.seed)
+    model = Linear_QNet(11, config.hidden_size, 3)
+    if model_file is not None:
+        model.load_state_dict(torch.load(model_file))
+    return parameters_to_vector(model.parameters()).detach().numpy().copy()
+
+def _worker(config, model_file, commands, results):
+    """
+    Worker process: keeps its own copy of theta and plays the candidates it is
+    given. Each command carries the previous generation's update (seeds and
+    rank coefficients) and the jobs (index, noise seed, sign) to evaluate.
+    Only seeds and returns go through the queues.
+    """
+    torch.set_num_threads(1)  # One core per worker
+    model = Linear_QNet(11, config.hidden_size, 3)
+    theta = initial_theta(config, model_file)
+    try:
+        while True:
+            command = commands.get()
+            if command is None:
+                break
+            update, game_seeds, jobs = command
+            if update is not None:
+                theta = apply_update(theta, *update, config)
+            for index, seed, sign in jobs:
+                candidate = theta + np.float32(sign * config.sigma) * perturbation(seed, theta.size)
+                results.put((index, *rollout(model, candidate, game_seeds, config.max_steps)))
+    except KeyboardInterrupt:
+        pass
+
+def train_es(config=None, workers=None, checkpoint_dir=ES_CHECKPOINT_DIR, model_dir=MODEL_DIR):
+    """
+    Trains Linear_QNet weights with evolution strategies (see ESConfig), the
+    candidates of each generation played by a pool of persistent workers.
+    Resumes from checkpoint_dir if a previous run left one there.
+
+    The record (best single-game score) is tracked as in train(), and the
+    candidate that set it is saved to model_dir/es_model.pth. Progress is
+    logged with the wall-clock time since the run first started, to compare
+    time-to-record with the DQN.
+
+    Args:
+    - config (ESConfig): Settings of the run (default: ESConfig()).
+    - workers (int): Number of worker processes (default: one per CPU).
+    - checkpoint_dir (str): Where the current weights and progress are kept.
+    - model_dir (str): Where the record model is saved.
+    """
+    if config is None:
+        config = ESConfig()
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    state_file = os.path.join(checkpoint_dir, "es_state.json")
+    model_file = os.path.join(checkpoint_dir, "checkpoint_model.pth")
+    generation, record, elapsed_before, history = 0, 0, 0.0, []
+    resume_file = None
+    if os.path.exists(state_file) and os.path.exists(model_file):
+        with open(state_file, 'r') as f:
+            state = json.load(f)
+        generation, record = state['generation'], state['record']
+        elapsed_before, history = state['elapsed'], state['history']
+        resume_file = model_file
+        print(f"Loaded ES state: Generation={generation}, Record={record}")
+
+    print(f"ES settings: {json.dumps(asdict(config))}")
+    model = Linear_QNet(11, config.hidden_size, 3)
+    theta = initial_theta(config, resume_file)
+
+    ctx = spawn_context()
+    results = ctx.Queue()
+    commands = [ctx.Queue() for _ in range(workers)]
+    processes = [ctx.Process(target=_worker, args=(config, resume_file, commands[i], results), daemon=True)
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    session_start = time.perf_counter()
+    update = None  # Last update, which the workers apply before the next generation
+    print(f"Starting ES with {workers} workers. Will train until {config.generations} generations or manual interruption.")
+
+    try:
+        while generation < config.generations:
+            generation_start = time.perf_counter()
+            noise_seeds, game_seeds = generation_seeds(config, generation)
+            jobs = [(2 * k + (sign < 0), seed, sign) for k, seed in enumerate(noise_seeds) for sign in (1, -1)]
+            for i in range(workers):
+                commands[i].put((update, game_seeds, jobs[i::workers]))
+
+            scores = np.zeros(len(jobs), dtype=np.float64)
+            returns = np.zeros(len(jobs), dtype=np.float64)
+            best_score, best_job, moves = -1, None, 0
+            received = 0
+            while received < len(jobs):
+                try:
+                    index, mean_score, mean_return, score, steps = results.get(timeout=1)
+                except queue.Empty:
+                    if not all(process.is_alive() for process in processes):
+                        raise RuntimeError("An ES worker process has exited")
+                    continue
+                received += 1
+                scores[index] = mean_score
+                returns[index] = mean_return
+                moves += steps
+                if score > best_score:
+                    best_score, best_job = score, jobs[index]
+
+            ranks = centered_ranks(scores, returns)
+            coefficients = (ranks[0::2] - ranks[1::2]).tolist()
+            update = (noise_seeds, coefficients)
+            generation += 1
+            elapsed = elapsed_before + time.perf_counter() - session_start
+
+            if best_score > record:
+                record = best_score
+                _, seed, sign = best_job
+                candidate = theta + np.float32(sign * config.sigma) * perturbation(seed, theta.size)
+                with torch.no_grad():
+                    vector_to_parameters(torch.from_numpy(candidate), model.parameters())
+                model.save(ES_MODEL_FILE, model_folder_path=model_dir)
+                print(f'New record {record} after {elapsed:.1f}s of training')
+
+            theta = apply_update(theta, noise_seeds, coefficients, config)
+            steps_per_second = moves / max(time.perf_counter() - generation_start, 1e-9)
+            print(f'Generation {generation}/{config.generations} - Mean score: {scores.mean():.2f},'
+                  f' Mean return: {returns.mean():.2f}, Best score: {best_score}, Record: {record} ({steps_per_second:.0f} steps/s, {elapsed:.0f}s)')
+            history.append({'generation': generation, 'elapsed': round(elapsed, 1),
+                            'mean_score': round(float(scores.mean()), 3),
+                            'mean_return': round(float(returns.mean()), 3), 'best_score': best_score,
+                            'record': record})
+
+            # The weights are tiny, so every generation is checkpointed
+            with torch.no_grad():
+                vector_to_parameters(torch.from_numpy(theta), model.parameters())
+            torch.save(model.state_dict(), model_file)
+            with open(state_file, 'w') as f:
+                json.dump({'generation': generation, 'record': record, 'elapsed': round(elapsed, 1),
+                           'config': asdict(config), 'history': history}, f, indent=2)
+
+        print(f"ES complete! Reached {config.generations} generations.")
+    except KeyboardInterrupt:
+        print("ES interrupted. The last generation is saved; you can resume later.")
+    finally:
+        for command_queue in commands:
+            command_queue.put(None)
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the Snake AI network with evolution strategies")
+    parser.add_argument('--workers', type=int, help="number of worker processes (default: one per CPU)")
+    for field in fields(ESConfig):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=field.type, dest=field.name,
+                            help=f"default: {field.default}")
+    args = parser.parse_args()
+
+    overrides = {field.name: getattr(args, field.name) for field in fields(ESConfig)
+                 if getattr(args, field.name) is not None}
+    train_es(replace(ESConfig(), **overrides), workers=args.workers)
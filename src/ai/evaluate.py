@@ -0,0 +1,128 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from src.game.snake_core import SnakeGameCore, SplitMix64
+from src.ai.features import state_code
+from src.ai.processes import spawn_context
+
+MAX_STEPS = 20_000  # Moves after which an episode is cut off, so a policy stuck in a loop still ends
+
+# Policy of the worker process, set once by _init_worker
+_actions = None
+
+def _init_worker(actions):
+    global _actions
+    _actions = actions
+
+def play_episode(actions, seed, max_steps=MAX_STEPS):
+    """
+    Plays one greedy game on a headless core.
+
+    Args:
+    actions: Best action for every state code (PolicyTable.actions).
+    seed: Seed of the game's food placement.
+    max_steps: Moves after which the game is cut off.
+
+    Returns:
+    Tuple (score, moves, death cause, total reward). The death cause is
+    "collision", "timeout" (frame limit) or "max_steps" if the game was cut off.
+    """
+    game = SnakeGameCore(rng=SplitMix64(seed))
+    total_reward = 0.0
+    for moves in range(1, max_steps + 1):
+        reward, done, score = game.play_step(int(actions[state_code(game)]))
+        total_reward += reward
+        if done:
+            return score, moves, game.death_cause, total_reward
+    return game.score, max_steps, "max_steps", total_reward
+
+def _play(args):
+    return play_episode(_actions, *args)
+
+def _summary(values):
+    values = np.asarray(values)
+    return {
+        'mean': round(float(values.mean()), 3),
+        'median': float(np.median(values)),
+        'p95': round(float(np.percentile(values, 95)), 3),
+        'max': int(values.max()),
+    }
+
+def evaluate_policy(table, episodes=1000, seed=0, max_steps=MAX_STEPS, workers=None):
+    """
+    Plays greedy episodes of a policy across a process pool and summarises them.
+    Episode i is seeded with seed + i, so the results do not depend on the
+    number of workers.
+
+    Args:
+    table: The PolicyTable to evaluate.
+    episodes: Number of games.
+    seed: Seed of the first game.
+    max_steps: Moves after which a game is cut off.
+    workers: Number of processes (default: one per CPU; 1 plays in this process).
+
+    Returns:
+    Dict with score and episode length statistics (mean, median, p95, max),
+    the count of each death cause, and the throughput in moves per second.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    jobs = [(seed + i, max_steps) for i in range(episodes)]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [play_episode(table.actions, *job) for job in jobs]
+    else:
+        with spawn_context().Pool(workers, initializer=_init_worker, initargs=(table.actions,)) as pool:
+            results = pool.map(_play, jobs, chunksize=max(1, episodes // (4 * workers)))
+    elapsed = time.perf_counter() - start
+
+    scores, lengths, causes, _ = zip(*results)
+    death_causes = {cause: causes.count(cause) for cause in ("collision", "timeout", "max_steps")}
+    return {
+        'episodes': episodes,
+        'seed': seed,
+        'max_steps': max_steps,
+        'score': _summary(scores),
+        'length': _summary(lengths),
+        'death_causes': death_causes,
+        'seconds': round(elapsed, 3),
+        'steps_per_second': round(sum(lengths) / max(elapsed, 1e-9)),
+    }
+
+def evaluate(model_file, episodes=1000, seed=0, max_steps=MAX_STEPS, workers=None, hidden_size=256):
+    """
+    Evaluates a saved Linear_QNet with evaluate_policy(), through its policy table.
+
+    Returns:
+    The evaluate_policy() results, with the model file added.
+    """
+    # Imported here, so the spawned workers, which re-import this module, don't load torch
+    from src.ai.policy_table import load_policy_table
+
+    table = load_policy_table(model_file, hidden_size=hidden_size)
+    return {'model': model_file, **evaluate_policy(table, episodes, seed, max_steps, workers)}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluate a trained model over many headless greedy games")
+    parser.add_argument('model', nargs='?', default="data/models/model.pth",
+                        help="saved model to evaluate (default: data/models/model.pth)")
+    parser.add_argument('--episodes', type=int, default=1000, help="number of games")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game; game i uses seed + i")
+    parser.add_argument('--max-steps', type=int, default=MAX_STEPS,
+                        help="moves after which a game is cut off")
+    parser.add_argument('--workers', type=int, help="number of processes (default: one per CPU)")
+    parser.add_argument('--hidden-size', type=int, default=256, help="hidden layer size of the model")
+    parser.add_argument('--output', metavar='FILE', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        sys.exit(f"Model file not found: {args.model}")
+    results = evaluate(args.model, args.episodes, args.seed, args.max_steps, args.workers, args.hidden_size)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
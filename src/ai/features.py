@@ -0,0 +1,122 @@
+import numpy as np
+from src.game.snake_core import TURN, RIGHT, LEFT, UP, DOWN
+from src.game.snake_batch import TURN_TABLE
+
+# The agent's state is 11 binary features, so every state fits in an 11-bit
+# code: bit i holds feature i of get_state() below.
+STATE_SIZE = 11
+N_CODES = 1 << STATE_SIZE
+
+_BIT_VALUES = 1 << np.arange(STATE_SIZE)
+
+# STATE_TABLE[code] -> the state vector as float32, ready for the network
+STATE_TABLE = ((np.arange(N_CODES)[:, None] >> np.arange(STATE_SIZE)) & 1).astype(np.float32)
+
+def pack_state(state):
+    """
+    Packs one 11-feature state vector into its integer code.
+    """
+    return int(np.dot(state, _BIT_VALUES))
+
+def pack_states(states):
+    """
+    Packs an (n, 11) array of state vectors into an array of uint16 codes.
+    """
+    return (np.asarray(states) @ _BIT_VALUES).astype(np.uint16)
+
+def unpack_states(codes):
+    """
+    Expands state codes (a single code or an array of them) into float32 state vectors.
+    """
+    return STATE_TABLE[codes]
+
+def get_state(game):
+    """
+    Extracts the current state of the game as an 11-dimensional vector.
+    The state includes danger information, movement direction, and food location.
+    """
+    head = game.snake[0]  # Cell of the snake's head
+    head_x, head_y = game.cell_xy(head)
+    food_x, food_y = game.cell_xy(game.food) if game.food is not None else (head_x, head_y)  # No food once the board is full
+
+    # Movement directions
+    dir_u = game.direction == UP
+    dir_r = game.direction == RIGHT
+    dir_d = game.direction == DOWN
+    dir_l = game.direction == LEFT
+
+    if getattr(game, 'bitboard', None) is not None:
+        # Same three features from the body mask, with the same edge rule
+        danger = game.bitboard.danger(game.body_bits, head, game.direction)
+    else:
+        # Cells straight ahead, to the right and to the left of the head.
+        # The state has never looked across the board edge (the trained
+        # model expects that), so those neighbours are None.
+        danger = []
+        for direction in TURN[game.direction]:  # Straight, right, left
+            cell = game.inner_neighbours[direction][head]
+            danger.append(cell is not None and game.is_collision(cell))
+
+    # State representation: Danger, direction, and food location
+    state = [
+        *danger,
+
+        # Current movement direction
+        dir_l,
+        dir_r,
+        dir_u,
+        dir_d,
+
+        # Food location relative to the head
+        food_x < head_x,  # Food is left
+        food_x > head_x,  # Food is right
+        food_y < head_y,  # Food is up
+        food_y > head_y  # Food is down
+    ]
+
+    return np.array(state, dtype=int)
+
+def get_states(env):
+    """
+    Extracts the 11-dimensional state of every board in a BatchSnakeEnv.
+    Produces exactly what get_state returns for each board, as one
+    (n_envs, 11) array computed with array indexing.
+    """
+    boards = np.arange(env.n_envs)
+    head = env.head
+    head_x, head_y = head % env.cols, head // env.cols
+    has_food = env.food >= 0  # No food once the board is full
+    food_x = np.where(has_food, env.food % env.cols, head_x)
+    food_y = np.where(has_food, env.food // env.cols, head_y)
+
+    # Cells straight ahead, to the right and to the left of each head.
+    # As in get_state, nothing is looked up across the board edge (-1).
+    sides = TURN_TABLE[env.direction]
+    cells = env.inner_neighbours[sides, head[:, None]]
+    danger = (cells >= 0) & (env.occupancy[boards[:, None], np.maximum(cells, 0)] > 0)
+
+    state = np.stack([
+        danger[:, 0],  # Danger straight
+        danger[:, 1],  # Danger right
+        danger[:, 2],  # Danger left
+
+        # Current movement direction
+        env.direction == LEFT,
+        env.direction == RIGHT,
+        env.direction == UP,
+        env.direction == DOWN,
+
+        # Food location relative to the head
+        food_x < head_x,  # Food is left
+        food_x > head_x,  # Food is right
+        food_y < head_y,  # Food is up
+        food_y > head_y  # Food is down
+    ], axis=1)
+
+    return state.astype(int)
+
+def state_code(game):
+    """
+    Returns the packed code of the game's current state.
+    """
+    return pack_state(get_state(game))
@@ -2,6 +2,8 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import torch.nn.functional as F
+import numpy as np
+import copy
 import os
 
 # Define the Linear_QNet class for the neural network
@@ -37,14 +39,14 @@ class Linear_QNet(nn.Module):
         x = self.linear2(x)  # Compute the output
         return x
 
-    def save(self, file_name='model.pth'):
+    def save(self, file_name='model.pth', model_folder_path='./data/models'):
         """
         Save the model's state dictionary to a file.
 
         Args:
         - file_name (str): Name of the file where the model will be saved.
+        - model_folder_path (str): Directory to save the model in.
         """
-        model_folder_path = './data/models'  # Directory to save the model
         if not os.path.exists(model_folder_path):
             os.makedirs(model_folder_path)  # Create the directory if it doesn't exist
 
@@ -52,13 +54,23 @@ class Linear_QNet(nn.Module):
         torch.save(self.state_dict(), file_name)  # Save the state dictionary
 
 
+def _as_tensor(data, dtype):
+    """
+    Converts array-like data to a tensor of the given type, without copying
+    data that is already a tensor of that type.
+    """
+    if isinstance(data, torch.Tensor):
+        return data.to(dtype)
+    return torch.tensor(np.asarray(data), dtype=dtype)
+
+
 # Define the QTrainer class for training the neural network
 class QTrainer:
     """
     Trainer class for the Q-learning model.
     Handles the optimization and loss computation during training.
     """
-    def __init__(self, model, lr, gamma):
+    def __init__(self, model, lr, gamma, target_sync=0, tau=0.0, double=False):
         """
         Initialize the trainer.
 
@@ -66,29 +78,60 @@ class QTrainer:
         - model (nn.Module): The Q-learning model to train.
         - lr (float): Learning rate for the optimizer.
         - gamma (float): Discount factor for future rewards.
+        - target_sync (int): Bootstrap from a frozen copy of the model (target
+          network), copied over from the model every target_sync training steps.
+        - tau (float): Instead of hard copies, move the target network this
+          fraction of the way towards the model after every step (Polyak
+          averaging). Setting both target_sync and tau raises a ValueError.
+        - double (bool): Double DQN: the model picks the next action and the
+          target network values it. Needs a target network (target_sync or
+          tau); a ValueError is raised without one.
         """
+        if target_sync > 0 and tau > 0:
+            raise ValueError("Set either target_sync (hard syncs) or tau (soft syncs), not both")
+        if double and target_sync <= 0 and tau <= 0:
+            raise ValueError("Double DQN needs a target network: set target_sync or tau as well")
         self.lr = lr
         self.gamma = gamma
         self.model = model
         self.optimizer = optim.Adam(model.parameters(), lr=self.lr)  # Adam optimizer
         self.criterion = nn.MSELoss()  # Mean Squared Error loss function
 
-    def train_step(self, state, action, reward, next_state, done):
+        self.target_sync = target_sync
+        self.tau = tau
+        self.double = double
+        self.steps = 0  # Training steps taken, for hard target syncs
+        self.target_model = None
+        if target_sync > 0 or tau > 0:
+            self.target_model = copy.deepcopy(model)
+            self.target_model.requires_grad_(False)
+
+    def train_step(self, state, action, reward, next_state, done, weights=None):
         """
         Perform a single training step.
 
         Args:
         - state (array-like): Current state.
-        - action (array-like): Action taken.
+        - action (array-like): Action taken, one-hot or as an index.
         - reward (array-like): Reward received.
         - next_state (array-like): Next state.
         - done (array-like): Whether the episode is done.
+        - weights (array-like, optional): Importance-sampling weight of each sample
+          (from prioritized replay). Each sample's loss is scaled by its weight.
+
+        Returns:
+        - torch.Tensor: TD error of each sample (target minus prediction for the action taken).
         """
-        # Convert inputs to tensors
-        state = torch.tensor(state, dtype=torch.float)
-        next_state = torch.tensor(next_state, dtype=torch.float)
-        action = torch.tensor(action, dtype=torch.long)
-        reward = torch.tensor(reward, dtype=torch.float)
+        # Convert inputs to tensors (through NumPy, as batches may arrive as tuples of arrays)
+        state = _as_tensor(state, torch.float)
+        next_state = _as_tensor(next_state, torch.float)
+        action = _as_tensor(action, torch.long)
+        reward = _as_tensor(reward, torch.float)
+        done = _as_tensor(done, torch.bool)
+
+        # One-hot actions have the same number of dimensions as the states; indices have one less
+        if action.dim() == state.dim():
+            action = action.argmax(dim=-1)
 
         # Ensure batch dimensions for single data points
         if len(state.shape) == 1:
@@ -96,24 +139,85 @@ class QTrainer:
             next_state = torch.unsqueeze(next_state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done, )
+            done = torch.unsqueeze(done, 0)
 
         # Predicted Q-values for the current state
         pred = self.model(state)
 
-        # Clone the predictions to compute the target values
-        target = pred.clone()
-        for idx in range(len(done)):
-            Q_new = reward[idx]  # Initialize Q_new with the immediate reward
-            if not done[idx]:
-                # Add the discounted maximum Q-value of the next state
-                Q_new = reward[idx] + self.gamma * torch.max(self.model(next_state[idx]))
-
-            # Update the target for the action taken
-            target[idx][torch.argmax(action[idx]).item()] = Q_new
+        # Bellman targets for the whole batch: the immediate reward, plus the
+        # discounted maximum Q-value of the next state unless the episode ended
+        with torch.no_grad():
+            bootstrap = self.target_model if self.target_model is not None else self.model
+            if self.double:
+                next_action = self.model(next_state).argmax(dim=1, keepdim=True)
+                next_q = bootstrap(next_state).gather(1, next_action).squeeze(1)
+            else:
+                next_q = bootstrap(next_state).max(dim=1).values
+        q_new = torch.where(done, reward, reward + self.gamma * next_q)
+
+        # Only the Q-value of the action taken moves towards its target
+        target = pred.detach().clone()
+        target.scatter_(1, action.unsqueeze(1), q_new.unsqueeze(1))
 
         # Perform backpropagation
         self.optimizer.zero_grad()  # Clear gradients
-        loss = self.criterion(target, pred)  # Compute the loss
+        if weights is None:
+            loss = self.criterion(target, pred)  # Compute the loss
+        else:
+            # Same mean squared error, with each sample's share scaled by its weight
+            weights = _as_tensor(weights, torch.float).reshape(-1)
+            loss = (weights * ((target - pred) ** 2).mean(dim=1)).mean()
         loss.backward()  # Backpropagate the loss
         self.optimizer.step()  # Update the model parameters
+        self._update_target()
+
+        return (q_new - pred.detach().gather(1, action.unsqueeze(1)).squeeze(1))
+
+    def _update_target(self):
+        """
+        Brings the target network towards the model after a training step.
+        """
+        self.steps += 1
+        if self.target_model is None:
+            return
+        if self.tau > 0:
+            with torch.no_grad():
+                for target_param, param in zip(self.target_model.parameters(), self.model.parameters()):
+                    target_param.lerp_(param, self.tau)
+        elif self.steps % self.target_sync == 0:
+            self.sync_target()
+
+    def sync_target(self):
+        """
+        Copies the model into the target network, if there is one.
+        """
+        if self.target_model is not None:
+            self.target_model.load_state_dict(self.model.state_dict())
+
+    def state_dict(self):
+        """
+        Returns the trainer's own state (optimizer, step count and target
+        network) for checkpoints.
+        """
+        return {
+            'optimizer': self.optimizer.state_dict(),
+            'steps': self.steps,
+            'target_model': self.target_model.state_dict() if self.target_model is not None else None,
+        }
+
+    def load_state_dict(self, state):
+        """
+        Restores a state returned by state_dict(). A checkpoint without a
+        target network leaves the target as a copy of the model. The
+        learning rate stays the one this trainer was created with, not the
+        one saved with the optimizer, so a resumed run trains at the lr its
+        settings say.
+        """
+        self.optimizer.load_state_dict(state['optimizer'])
+        for group in self.optimizer.param_groups:
+            group['lr'] = self.lr
+        self.steps = state['steps']
+        if self.target_model is not None and state['target_model'] is not None:
+            self.target_model.load_state_dict(state['target_model'])
+        else:
+            self.sync_target()
@@ -0,0 +1,264 @@
+import os
+import json
+import queue
+import random
+import datetime
+from dataclasses import asdict
+import numpy as np
+import torch
+from src.game.snake_core import SnakeGameCore, SplitMix64
+from src.ai.features import state_code
+from src.ai.model import Linear_QNet
+from src.ai.policy_table import PolicyTable
+from src.ai.agent import Agent, TrainConfig
+from src.ai.processes import spawn_context
+from src.utils.plotter import plot
+
+UNROLL_LENGTH = 100  # Moves an actor sends at a time, and plays between weight refreshes
+SLOTS_PER_ACTOR = 4  # Unrolls an actor may have in flight before it waits for the learner
+
+def _unroll_slots(n_slots):
+    """
+    Returns the unroll buffers shared by the actors and the learner, one row
+    per slot: the packed state codes (UNROLL_LENGTH + 1, the last one being
+    the state after the final move), the actions and the rewards.
+    """
+    codes = torch.zeros((n_slots, UNROLL_LENGTH + 1), dtype=torch.int16).share_memory_()
+    actions = torch.zeros((n_slots, UNROLL_LENGTH), dtype=torch.uint8).share_memory_()
+    rewards = torch.zeros((n_slots, UNROLL_LENGTH), dtype=torch.float32).share_memory_()
+    return codes, actions, rewards
+
+def _actor(actor_id, shared_model, version, lock, games, slots, free_slots, filled, stop, seed, config):
+    """
+    Actor process: plays headless games epsilon-greedily with a local copy of
+    the learner's model and hands its moves to the learner.
+
+    Moves are written straight into a free slot of the shared unroll buffers,
+    up to UNROLL_LENGTH at a time, and an unroll ends early when the game
+    does. Only the slot number goes through the filled queue; the learner
+    returns the slot to free_slots once it has copied the moves into its
+    replay memory, so an actor with every slot in flight waits for it.
+
+    Between unrolls the local copy is refreshed from the shared weights if
+    the learner has published new ones, and turned into a PolicyTable so
+    greedy moves are array lookups. Refreshing mid-game matters: the game
+    only times out from score 10 on, so a fixed greedy policy that circles
+    early would fill slots forever.
+
+    Args:
+    actor_id: Index of this actor, used in its seeds.
+    shared_model: Linear_QNet in shared memory, written by the learner.
+    version: Shared counter the learner bumps whenever it publishes weights.
+    lock: Held while the shared weights are written or copied.
+    games: Shared count of games the learner has trained on (drives epsilon).
+    slots: The shared unroll buffers (see _unroll_slots).
+    free_slots: Queue of this actor's slots the learner is done with.
+    filled: Queue of (slot, moves, done, score) the learner reads unrolls from.
+    stop: Event set by the learner when training ends.
+    seed: Base seed; actor i uses seed + i.
+    config: The run's TrainConfig (model size and exploration schedule).
+    """
+    torch.set_num_threads(1)  # One core per actor
+    filled.cancel_join_thread()  # Don't block exit on unrolls the learner will never read
+    codes, actions, rewards = (buffer.numpy() for buffer in slots)
+    rng = random.Random(seed + actor_id)
+    game = SnakeGameCore(rng=SplitMix64(seed + actor_id))
+    model = Linear_QNet(11, config.hidden_size, 3)
+    seen_version = -1
+    table = None
+    code = state_code(game)
+
+    try:
+        while not stop.is_set():
+            try:
+                slot = free_slots.get(timeout=1)
+            except queue.Empty:
+                continue
+            if version.value != seen_version:
+                with lock:
+                    seen_version = version.value
+                    model.load_state_dict(shared_model.state_dict())
+                table = PolicyTable.from_model(model)
+            epsilon = config.epsilon_start - config.epsilon_decay * games.value  # Same schedule as Agent.get_action_index
+
+            codes[slot, 0] = code
+            n = 0
+            done = False
+            while not done and n < UNROLL_LENGTH:
+                if rng.randint(0, 200) < epsilon:
+                    action = rng.randint(0, 2)  # Random action
+                else:
+                    action = table.action(code)
+                reward, done, score = game.play_step(action)
+                code = state_code(game)
+                codes[slot, n + 1] = code
+                actions[slot, n] = action
+                rewards[slot, n] = reward
+                n += 1
+            filled.put((slot, n, done, score if done else None))
+
+            if done:
+                game.reset()
+                code = state_code(game)
+    except KeyboardInterrupt:
+        pass  # The learner saves the checkpoint
+
+def _publish(agent, shared_model, version, lock):
+    """Copies the learner's weights into the shared model for the actors."""
+    with lock, torch.no_grad():
+        for shared, param in zip(shared_model.parameters(), agent.model.parameters()):
+            shared.copy_(param)
+        version.value += 1
+
+def _check_actors(actors):
+    """
+    Raises if an actor process has exited: its slots would never come back,
+    and training would go on with fewer actors.
+    """
+    for actor_id, actor in enumerate(actors):
+        if not actor.is_alive():
+            raise RuntimeError(f"Actor {actor_id} has exited with code {actor.exitcode}")
+
+def _save_plot_data(plot_data_file, plot_scores, plot_mean_scores):
+    with open(plot_data_file, 'w') as f:
+        json.dump({
+            'scores': plot_scores,
+            'mean_scores': plot_mean_scores
+        }, f)
+
+def train_parallel(n_actors, config=None, seed=None):
+    """
+    Actor/learner training: n_actors processes play headless games and one
+    learner (this process) owns the Agent, its replay memory and QTrainer.
+    The actors write their moves to buffers in shared memory (see _actor).
+    Each unroll of moves goes through Agent.observe_moves, a finished game
+    also gets a long-memory update as in train(), and the new weights are
+    then published to the actors through a model in shared memory.
+
+    Checkpoints, plot data and the record model are written as by train(),
+    so a run can be resumed by either. Stop it with Ctrl+C.
+
+    Args:
+    - n_actors (int): Number of actor processes.
+    - config (TrainConfig): Hyperparameters and update schedule (default: TrainConfig()).
+    - seed (int): Base seed of the actors' games (default: random).
+    """
+    if config is None:
+        config = TrainConfig()
+    if config.background_learner:
+        raise ValueError("The actors already play while the learner trains; background_learner cannot be combined with them")
+    if seed is None:
+        seed = random.getrandbits(32)
+
+    MAX_GAMES = config.max_games
+    agent = Agent(config=config)
+
+    print(f"Training settings: {json.dumps(asdict(config))}")
+    os.makedirs(agent.checkpoint_dir, exist_ok=True)
+    config.save(os.path.join(agent.checkpoint_dir, "train_config.json"))
+
+    plot_scores = []
+    plot_mean_scores = []
+    plot_data_file = os.path.join(agent.checkpoint_dir, "plot_data.json")
+    if os.path.exists(plot_data_file):
+        try:
+            with open(plot_data_file, 'r') as f:
+                plot_data = json.load(f)
+                plot_scores = plot_data.get('scores', [])
+                plot_mean_scores = plot_data.get('mean_scores', [])
+                print(f"Loaded plot data for {len(plot_scores)} previous games")
+        except Exception as e:
+            print(f"Error loading plot data: {e}")
+
+    ctx = spawn_context()
+    shared_model = Linear_QNet(11, config.hidden_size, 3)
+    shared_model.share_memory()
+    version = ctx.Value('l', 0, lock=False)
+    games = ctx.Value('l', agent.n_games, lock=False)
+    lock = ctx.Lock()
+    slots = _unroll_slots(SLOTS_PER_ACTOR * n_actors)
+    codes, actions, rewards = (buffer.numpy() for buffer in slots)
+    free_slots = [ctx.Queue() for _ in range(n_actors)]
+    for slot in range(SLOTS_PER_ACTOR * n_actors):
+        free_slots[slot // SLOTS_PER_ACTOR].put(slot)
+    filled = ctx.Queue()
+    stop = ctx.Event()
+    _publish(agent, shared_model, version, lock)
+
+    actors = [ctx.Process(target=_actor, args=(i, shared_model, version, lock, games, slots, free_slots[i],
+                                                filled, stop, seed, config), daemon=True)
+              for i in range(n_actors)]
+    for actor in actors:
+        actor.start()
+
+    session_start = datetime.datetime.now()
+    session_steps = agent.steps
+    last_save_time = session_start
+    save_interval = datetime.timedelta(minutes=10)  # Save every 10 minutes
+
+    print(f"Starting training session with {n_actors} actors. Will train until {MAX_GAMES} games or manual interruption.")
+    print(f"Current progress: {agent.n_games}/{MAX_GAMES} games completed")
+
+    try:
+        while agent.n_games < MAX_GAMES:
+            _check_actors(actors)
+            try:
+                slot, n, done, score = filled.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            dones = np.zeros(n, dtype=bool)
+            dones[-1] = done
+            # The replay memory keeps copies, so the slot can go back to its actor right away
+            agent.observe_moves(codes[slot, :n], actions[slot, :n], rewards[slot, :n], codes[slot, 1:n + 1], dones)
+            free_slots[slot // SLOTS_PER_ACTOR].put(slot)
+            if score is None:  # The game goes on
+                _publish(agent, shared_model, version, lock)
+                continue
+
+            agent.n_games += 1
+            agent.train_long_memory()
+            _publish(agent, shared_model, version, lock)
+            games.value = agent.n_games
+
+            agent.total_score += score
+            if score > agent.record:
+                agent.record = score
+                agent.model.save(model_folder_path=agent.model_dir)
+                elapsed = (datetime.datetime.now() - session_start).total_seconds()
+                print(f'New record {score} after {elapsed:.1f}s of this session')
+
+            elapsed = (datetime.datetime.now() - session_start).total_seconds()
+            steps_per_second = (agent.steps - session_steps) / max(elapsed, 1e-9)
+            print(f'Game {agent.n_games}/{MAX_GAMES} - Score: {score}, Record: {agent.record}'
+                  f' ({steps_per_second:.0f} steps/s)')
+
+            plot_scores.append(score)
+            plot_mean_scores.append(round(agent.total_score / agent.n_games, 2))
+            if agent.n_games % 10 == 0 or score > 10:
+                plot(plot_scores, plot_mean_scores)
+
+            now = datetime.datetime.now()
+            if now - last_save_time > save_interval:
+                last_save_time = now
+                agent.save_checkpoint()
+                _save_plot_data(plot_data_file, plot_scores, plot_mean_scores)
+                print("Auto-saved checkpoint and plot data")
+
+        print(f"Training complete! Reached {MAX_GAMES} games.")
+    except KeyboardInterrupt:
+        print("Training interrupted. Saving checkpoint...")
+    finally:
+        stop.set()
+        for actor in actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+
+    agent.save_checkpoint()
+    _save_plot_data(plot_data_file, plot_scores, plot_mean_scores)
+    if agent.n_games >= MAX_GAMES:
+        agent._save_model(os.path.join(agent.checkpoint_dir, agent.COMPLETED_FILE))
+        print(f"Final model saved after {MAX_GAMES} games of training.")
+    else:
+        print("Checkpoint and plot data saved. You can resume later.")
@@ -0,0 +1,62 @@
+import os
+from src.ai.model import Linear_QNet
+from src.ai.features import state_code
+from src.ai.policy_table import PolicyTable, load_policy_table
+
+# Where a trained model is looked for, in order
+MODEL_PATHS = ["data/models/model.pth", "model_snapshots/model.pth",
+               "data/checkpoints/checkpoint_model.pth"]
+
+# Loaded policies by model path, with the (mtime, size) of the file they came from
+_cache = {}
+
+class Policy:
+    """
+    Inference-only greedy player for the watch and VS modes.
+    Holds nothing but the model's policy table: no trainer, optimizer or
+    replay memory. Get one with load_policy(), which shares it between modes.
+    """
+
+    def __init__(self, table, source=None):
+        """
+        Args:
+        table: The PolicyTable to play from.
+        source: Path of the model file the table was built from (None if untrained).
+        """
+        self.table = table
+        self.source = source
+
+    def act(self, game):
+        """
+        Returns the greedy action index (0 straight, 1 right, 2 left) for the
+        game's current state. play_step accepts the index directly.
+        """
+        return self.table.action(state_code(game))
+
+def load_policy(model_paths=MODEL_PATHS):
+    """
+    Returns the greedy policy of the first model file found. The policy is
+    cached and only reloaded when the model file changes, so switching
+    between modes costs a stat() call.
+
+    Args:
+    model_paths: Model files to try, in order.
+
+    Returns:
+    A Policy (playing an untrained model if no file is found).
+    """
+    for path in model_paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            cached = _cache.get(path)
+            if cached is None or cached[0] != stamp:
+                cached = (stamp, Policy(load_policy_table(path), source=path))
+                _cache[path] = cached
+                print(f"Model loaded successfully from {path}")
+            return cached[1]
+
+    if None not in _cache:
+        print("Warning: No pre-trained model found. Using untrained model.")
+        _cache[None] = (None, Policy(PolicyTable.from_model(Linear_QNet(11, 256, 3))))
+    return _cache[None][1]
@@ -0,0 +1,110 @@
+import os
+import sys
+import hashlib
+import numpy as np
+import torch
+from src.ai.model import Linear_QNet
+from src.ai.features import STATE_TABLE, pack_state
+
+class PolicyTable:
+    """
+    The greedy policy of a Linear_QNet written out for every possible state.
+    The network only ever sees 11 binary features, i.e. 2048 distinct inputs,
+    so evaluating it once per state code turns greedy play into an array
+    lookup with no torch call per move.
+    """
+
+    def __init__(self, q_values):
+        """
+        Args:
+        q_values: Array of shape (2048, 3) with the Q-values of every state code.
+        """
+        self.q_values = np.asarray(q_values, dtype=np.float32)
+        self.actions = self.q_values.argmax(axis=1).astype(np.uint8)  # Best action per state code
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Builds the table by running the model once over all 2048 states.
+        """
+        with torch.inference_mode():
+            q_values = model(torch.from_numpy(STATE_TABLE)).numpy()
+        return cls(q_values)
+
+    def action(self, code):
+        """
+        Returns the greedy action index (0 straight, 1 right, 2 left) for a state code.
+        """
+        return int(self.actions[code])
+
+    def act(self, state):
+        """
+        Returns the greedy action index for a state vector from Agent.get_state.
+        """
+        return int(self.actions[pack_state(state)])
+
+    def save(self, file_name, source_hash=""):
+        """
+        Writes the table to an .npz file.
+
+        Args:
+        file_name: Path of the file to write.
+        source_hash: Hash of the model file the table was built from.
+        """
+        np.savez(file_name, q_values=self.q_values, actions=self.actions, source_hash=source_hash)
+
+def file_hash(file_name):
+    """
+    Returns the SHA-256 hex digest of a file's contents.
+    """
+    with open(file_name, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def table_file_for(model_file):
+    """
+    Returns where the table for a model file is kept: next to it, as <name>_policy.npz.
+    """
+    return os.path.splitext(model_file)[0] + "_policy.npz"
+
+def load_policy_table(model_file, table_file=None, hidden_size=256):
+    """
+    Loads the policy table of a saved model, exporting it first if there is
+    no table yet or the model file has changed since the table was made
+    (tables record the hash of the model file they came from).
+
+    Args:
+    model_file: Path to a saved Linear_QNet state dict.
+    table_file: Where the table is kept (default: next to the model file).
+    hidden_size: Hidden layer size of the saved model.
+
+    Returns:
+    A PolicyTable.
+    """
+    if table_file is None:
+        table_file = table_file_for(model_file)
+    source_hash = file_hash(model_file)
+
+    if os.path.exists(table_file):
+        try:
+            with np.load(table_file) as data:
+                if str(data['source_hash']) == source_hash:
+                    return PolicyTable(data['q_values'])
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Error loading policy table, rebuilding it: {e}")
+
+    model = Linear_QNet(11, hidden_size, 3)
+    model.load_state_dict(torch.load(model_file))
+    model.eval()
+    table = PolicyTable.from_model(model)
+    try:
+        table.save(table_file, source_hash)
+    except OSError as e:
+        print(f"Could not save policy table: {e}")
+    return table
+
+if __name__ == '__main__':
+    model_file = sys.argv[1] if len(sys.argv) > 1 else "data/models/model.pth"
+    table = load_policy_table(model_file)
+    counts = np.bincount(table.actions, minlength=3)
+    print(f"Policy table for {model_file} saved to {table_file_for(model_file)}")
+    print(f"Actions over all 2048 states: straight={counts[0]}, right={counts[1]}, left={counts[2]}")
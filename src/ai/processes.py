@@ -0,0 +1,22 @@
+def spawn_context():
+    """
+    Returns the multiprocessing context that the actors (parallel.py), the
+    sweep runs (sweep.py), the ES workers (es.py) and the evaluation pool
+    (evaluate.py) are started from.
+
+    They are spawned rather than forked. A forked child gets a copy of the
+    parent's torch state, including its intra-op thread pool, whose threads
+    do not exist in the child and can hang its first parallel kernel; it
+    would also inherit whatever the parent holds, such as a learner's
+    replay memory. Spawning costs each worker a fresh interpreter and its
+    imports, about a second, once per run. Workers that run torch then call
+    torch.set_num_threads(1), since together they already use every core.
+
+    Returns:
+    The "spawn" context of torch.multiprocessing, whose queues share tensors
+    through shared memory.
+    """
+    # Imported on call: evaluate.py's workers import this module but only ever look up NumPy tables
+    import torch.multiprocessing as mp
+
+    return mp.get_context("spawn")
@@ -0,0 +1,327 @@
+import numpy as np
+import torch
+from src.ai.features import pack_state, pack_states, unpack_states
+
+class ReplayBuffer:
+    """
+    Fixed-size replay memory for experience replay.
+    Transitions live in preallocated NumPy arrays used as a ring buffer, so
+    storing one is a few array writes and sampling a batch is a single
+    fancy-indexing copy that torch.from_numpy wraps without copying again.
+
+    States are kept as packed uint16 codes (see src.ai.features), which puts
+    a transition at 10 bytes: 100k of them take about 1 MB.
+    """
+
+    def __init__(self, capacity, seed=None):
+        """
+        Allocates an empty buffer.
+
+        Args:
+        capacity: Maximum number of transitions; the oldest ones are overwritten first.
+        seed: Seed for the sampling generator.
+        """
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+
+        self.states = np.zeros(capacity, dtype=np.uint16)  # Packed state codes
+        self.actions = np.zeros(capacity, dtype=np.uint8)  # Action index: 0 straight, 1 right, 2 left
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.uint16)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        self.position = 0  # Slot the next transition is written to
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, state, action, reward, next_state, done):
+        """
+        Stores one transition, overwriting the oldest one once the buffer is full.
+
+        Args:
+        state: State vector before the move, or its packed code (Python or NumPy integer).
+        action: Index of the action taken.
+        reward: Reward received.
+        next_state: State vector after the move, or its packed code.
+        done: Whether the game ended.
+        """
+        i = self.position
+        self.states[i] = state if np.ndim(state) == 0 else pack_state(state)
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state if np.ndim(next_state) == 0 else pack_state(next_state)
+        self.dones[i] = done
+
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """
+        Stores a run of transitions at once, e.g. a whole game. If there
+        are more than the capacity, only the last ones are kept.
+
+        Args:
+        states: Packed state codes before each move.
+        actions: Action indices.
+        rewards: Rewards received.
+        next_states: Packed state codes after each move.
+        dones: Whether each move ended the game.
+
+        Returns:
+        The slots the transitions were written to.
+        """
+        n = min(len(actions), self.capacity)
+        slots = (self.position + np.arange(n)) % self.capacity
+        self.states[slots] = states[-n:]
+        self.actions[slots] = actions[-n:]
+        self.rewards[slots] = rewards[-n:]
+        self.next_states[slots] = next_states[-n:]
+        self.dones[slots] = dones[-n:]
+
+        self.position = (self.position + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        return slots
+
+    def sample(self, batch_size):
+        """
+        Draws a batch of distinct transitions uniformly at random.
+        If the buffer holds no more than batch_size transitions, all of them are returned.
+
+        Args:
+        batch_size: Number of transitions to draw.
+
+        Returns:
+        Tuple of tensors (states, actions, rewards, next_states, dones), with
+        the states expanded back into float vectors.
+        """
+        if self.size > batch_size:
+            idx = self.rng.choice(self.size, batch_size, replace=False)
+        else:
+            idx = np.arange(self.size)
+        return self._batch(idx)
+
+    def recent(self, n):
+        """
+        Returns the n most recently stored transitions (fewer if the buffer
+        holds fewer), as tensors in the same layout as sample().
+        """
+        n = min(n, self.size)
+        return self._batch((self.position - n + np.arange(n)) % self.capacity)
+
+    def _batch(self, idx):
+        """
+        Gathers the transitions at the given slots as tensors.
+        """
+        return (
+            torch.from_numpy(unpack_states(self.states[idx])),
+            torch.from_numpy(self.actions[idx]).long(),
+            torch.from_numpy(self.rewards[idx]),
+            torch.from_numpy(unpack_states(self.next_states[idx])),
+            torch.from_numpy(self.dones[idx]),
+        )
+
+    def save(self, file_name):
+        """
+        Writes the buffer to a single .npz file.
+        """
+        np.savez(
+            file_name, states=self.states[:self.size], actions=self.actions[:self.size],
+            rewards=self.rewards[:self.size], next_states=self.next_states[:self.size],
+            dones=self.dones[:self.size], position=self.position
+        )
+
+    def load(self, file_name):
+        """
+        Reads a buffer written by save(). If the file holds more transitions
+        than the capacity, the most recent ones are kept.
+        """
+        with np.load(file_name) as data:
+            states, next_states = data['states'], data['next_states']
+            if states.ndim == 2:  # Written before states were packed
+                states, next_states = pack_states(states), pack_states(next_states)
+
+            size = len(data['actions'])
+            # Unroll the ring so the oldest transition comes first
+            order = np.roll(np.arange(size), -int(data['position']) if size else 0)
+            order = order[-self.capacity:]
+            n = len(order)
+            self.states[:n] = states[order]
+            self.actions[:n] = data['actions'][order]
+            self.rewards[:n] = data['rewards'][order]
+            self.next_states[:n] = next_states[order]
+            self.dones[:n] = data['dones'][order]
+        self.size = n
+        self.position = n % self.capacity
+
+
+class SumTree:
+    """
+    Binary tree of priorities stored in one array, where every node holds the
+    sum of its children. Leaves can be updated and drawn in proportion to
+    their priority in O(log n), and both work on whole batches of leaves.
+    """
+
+    def __init__(self, capacity):
+        """
+        Creates a tree with all priorities at zero.
+
+        Args:
+        capacity: Number of leaves.
+        """
+        self.capacity = capacity
+        self.depth = max(1, (capacity - 1).bit_length())
+        self.n_leaves = 1 << self.depth
+        # Node 1 is the root, the children of node i are 2i and 2i + 1
+        self.nodes = np.zeros(2 * self.n_leaves, dtype=np.float64)
+
+    def total(self):
+        """
+        Returns the sum of all priorities.
+        """
+        return self.nodes[1]
+
+    def get(self, leaves):
+        """
+        Returns the priorities of the given leaves.
+        """
+        return self.nodes[np.asarray(leaves) + self.n_leaves]
+
+    def update(self, leaves, priorities):
+        """
+        Sets the priorities of a batch of leaves and refreshes their ancestors.
+
+        Args:
+        leaves: Leaf indices (repeats keep the last priority).
+        priorities: New priority for each leaf.
+        """
+        nodes = np.asarray(leaves) + self.n_leaves
+        self.nodes[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+
+    def update_one(self, leaf, priority):
+        """
+        Sets the priority of a single leaf. Cheaper than update() for one leaf,
+        as it walks the path to the root without array operations.
+        """
+        node = leaf + self.n_leaves
+        nodes = self.nodes
+        nodes[node] = priority
+        node //= 2
+        while node:
+            nodes[node] = nodes[2 * node] + nodes[2 * node + 1]
+            node //= 2
+
+    def find(self, values):
+        """
+        Finds, for each value in [0, total), the leaf whose priority range contains it.
+
+        Args:
+        values: Array of cumulative priority values.
+
+        Returns:
+        Array of leaf indices.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = self.nodes[2 * nodes]
+            go_right = values >= left
+            values -= left * go_right
+            nodes = 2 * nodes + go_right
+        return nodes - self.n_leaves
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    Replay memory that draws transitions in proportion to their TD error
+    (proportional prioritized experience replay). New transitions get the
+    highest priority seen so far, so each is replayed at least once soon.
+    The bias of non-uniform sampling is corrected with importance-sampling
+    weights, whose exponent beta is annealed towards 1.
+    """
+
+    def __init__(self, capacity, alpha=0.6, beta=0.4, beta_increment=0.001, epsilon=1e-5, seed=None):
+        """
+        Allocates an empty buffer.
+
+        Args:
+        capacity: Maximum number of transitions; the oldest ones are overwritten first.
+        alpha: How strongly priorities skew sampling (0 is uniform).
+        beta: Initial importance-sampling exponent.
+        beta_increment: Amount beta grows by on every sample, up to 1.
+        epsilon: Added to every TD error so no transition becomes unreachable.
+        seed: Seed for the sampling generator.
+        """
+        super().__init__(capacity, seed=seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def append(self, state, action, reward, next_state, done):
+        """
+        Stores one transition at the highest priority seen so far.
+        """
+        slot = self.position
+        super().append(state, action, reward, next_state, done)
+        self.tree.update_one(slot, self.max_priority)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """
+        Stores a run of transitions at the highest priority seen so far.
+        """
+        slots = super().extend(states, actions, rewards, next_states, dones)
+        self.tree.update(slots, np.full(len(slots), self.max_priority))
+        return slots
+
+    def sample(self, batch_size):
+        """
+        Draws a batch in proportion to priority, one draw from each of
+        batch_size equal slices of the total priority.
+
+        Args:
+        batch_size: Number of transitions to draw.
+
+        Returns:
+        batch: Tuple of tensors (states, actions, rewards, next_states, dones).
+        weights: Importance-sampling weight of each transition (max 1), as a tensor.
+        idx: Slots of the drawn transitions, to pass back to update_priorities().
+        """
+        batch_size = min(batch_size, self.size)
+        total = self.tree.total()
+        bounds = np.linspace(0, total, batch_size + 1)
+        values = self.rng.uniform(bounds[:-1], bounds[1:])
+        idx = np.minimum(self.tree.find(np.minimum(values, np.nextafter(total, 0))), self.size - 1)
+
+        probs = self.tree.get(idx) / total
+        weights = (self.size * probs) ** -self.beta
+        weights /= weights.max()
+        self.beta = min(1.0, self.beta + self.beta_increment)
+
+        return self._batch(idx), torch.from_numpy(weights.astype(np.float32)), idx
+
+    def update_priorities(self, idx, td_errors):
+        """
+        Sets the priorities of sampled transitions from their new TD errors.
+
+        Args:
+        idx: Slots returned by sample().
+        td_errors: TD error of each transition (array or tensor).
+        """
+        priorities = (np.abs(np.asarray(td_errors, dtype=np.float64)) + self.epsilon) ** self.alpha
+        self.tree.update(idx, priorities)
+        self.max_priority = max(self.max_priority, priorities.max())
+
+    def load(self, file_name):
+        """
+        Reads a buffer written by save(). Priorities are not saved, so every
+        loaded transition starts at the highest priority.
+        """
+        super().load(file_name)
+        self.tree = SumTree(self.capacity)
+        self.tree.update(np.arange(self.size), np.full(self.size, self.max_priority))
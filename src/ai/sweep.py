@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import datetime
+import itertools
+from contextlib import redirect_stdout
+from dataclasses import fields
+import numpy as np
+import torch
+from src.ai.agent import TrainConfig, train
+from src.ai.tabular import NETWORK_SETTINGS
+from src.ai.policy_table import PolicyTable
+from src.ai.evaluate import evaluate_policy
+from src.ai.processes import spawn_context
+
+SWEEP_DIR = "data/sweeps"
+EVAL_EPISODES = 100  # Greedy games played to score each trained model
+
+def expand_spec(spec):
+    """
+    Turns a sweep spec into the settings of each run.
+
+    A spec is a dict (usually read from JSON) with:
+    - "params": the TrainConfig fields to vary. A list gives the values to
+      try. {"min": a, "max": b} draws uniformly from a range, and adding
+      "log": true draws log-uniformly. Ranges are only allowed with random search.
+    - "method": "grid" (every combination of the lists, the default) or "random".
+    - "runs": number of runs of a random search.
+    - "seed": seed of the random search and of the runs themselves (default 0).
+    - "base": TrainConfig settings shared by every run, e.g. {"max_games": 300}.
+    - "tabular": true to train TabularAgents instead of the network. Settings
+      that the chosen agent ignores (lr for a table, table_lr for the network)
+      are rejected, in "params" and "base" alike, as they would change nothing.
+
+    Returns:
+    A list of dicts, the fields each run changes from the base settings.
+    """
+    params = spec.get("params", {})
+    settings = set(params) | set(spec.get("base", {}))
+    known = {field.name: field for field in fields(TrainConfig)}
+    unknown = settings - set(known)
+    if unknown:
+        raise ValueError(f"Unknown training settings: {', '.join(sorted(unknown))}")
+    tabular = spec.get("tabular", False)
+    ignored = settings & set(NETWORK_SETTINGS if tabular else ("table_lr",))
+    if ignored:
+        agent = "a Q-table" if tabular else "the network"
+        raise ValueError(f"Settings that do not apply to {agent}: {', '.join(sorted(ignored))}")
+
+    method = spec.get("method", "grid")
+    if method == "grid":
+        for name, values in params.items():
+            if not isinstance(values, list):
+                raise ValueError(f"Grid search needs a list of values for {name}")
+        names = list(params)
+        return [dict(zip(names, combo)) for combo in itertools.product(*params.values())]
+
+    if method == "random":
+        rng = random.Random(spec.get("seed", 0))
+        runs = []
+        for _ in range(spec.get("runs", 10)):
+            run = {}
+            for name, values in params.items():
+                if isinstance(values, list):
+                    run[name] = rng.choice(values)
+                    continue
+                low, high = values["min"], values["max"]
+                if values.get("log", False):
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+                run[name] = round(value) if known[name].type is int else value
+            runs.append(run)
+        return runs
+
+    raise ValueError(f"Unknown search method {method!r}; use 'grid' or 'random'")
+
+def _run(job):
+    """
+    Trains and evaluates one run of a sweep in a worker process. Training
+    output goes to train.log in the run's directory.
+
+    Args:
+    job: Tuple (index, overrides, base settings, sweep directory, tabular,
+        evaluation episodes, seed).
+
+    Returns:
+    Dict with the run's settings, training results and evaluation.
+    """
+    index, overrides, base, sweep_dir, tabular, episodes, seed = job
+    torch.set_num_threads(1)  # The pool already uses every core
+    random.seed(seed + index)
+    np.random.seed(seed + index)
+    torch.manual_seed(seed + index)
+
+    run_dir = os.path.join(sweep_dir, f"run_{index:03d}")
+    os.makedirs(run_dir, exist_ok=True)
+    result = {'run': index, 'params': overrides, 'dir': run_dir}
+    try:
+        config = TrainConfig(**{**base, **overrides})
+        start = time.perf_counter()
+        with open(os.path.join(run_dir, "train.log"), 'w') as log, redirect_stdout(log):
+            agent = train(headless=True, tabular=tabular, config=config, checkpoint_dir=run_dir,
+                          model_dir=os.path.join(run_dir, "models"), plot_progress=False)
+        result['seconds'] = round(time.perf_counter() - start, 1)
+
+        with open(os.path.join(run_dir, "plot_data.json"), 'r') as f:
+            scores = json.load(f)['scores']
+        table = PolicyTable(agent.model.q_values) if tabular else PolicyTable.from_model(agent.model)
+        evaluation = evaluate_policy(table, episodes=episodes, seed=seed, workers=1)
+        result.update({
+            'games': agent.n_games,
+            'record': agent.record,
+            'last_100_mean': round(float(np.mean(scores[-100:])), 2) if scores else 0.0,
+            'eval': {'score': evaluation['score'], 'length': evaluation['length'],
+                     'death_causes': evaluation['death_causes']},
+        })
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def format_table(results):
+    """
+    Renders sweep results as a text table, best evaluation score first.
+    """
+    names = sorted({name for result in results for name in result['params']})
+    header = ["run", *names, "games", "record", "last 100", "eval mean", "eval p95", "eval max", "time (s)"]
+    rows = []
+    ranked = sorted(results, key=lambda r: r['eval']['score']['mean'] if 'eval' in r else -math.inf, reverse=True)
+    for result in ranked:
+        values = [f"{result['params'][name]:.4g}" if isinstance(result['params'].get(name), float)
+                  else str(result['params'].get(name, "")) for name in names]
+        if 'error' in result:
+            rows.append([str(result['run']), *values, f"failed: {result['error']}"])
+            continue
+        score = result['eval']['score']
+        rows.append([str(result['run']), *values, str(result['games']), str(result['record']),
+                     f"{result['last_100_mean']:.2f}", f"{score['mean']:.2f}", f"{score['p95']:.1f}",
+                     str(score['max']), f"{result['seconds']:.0f}"])
+
+    widths = [max(len(row[i]) for row in [header, *rows] if i < len(row)) for i in range(len(header))]
+    lines = [header, ["-" * width for width in widths], *rows]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() for line in lines)
+
+def run_sweep(spec, workers=None, episodes=EVAL_EPISODES, sweep_dir=None):
+    """
+    Trains every run of a sweep spec (see expand_spec) headless on a process
+    pool, one run per worker at a time, each in its own directory with its
+    own checkpoints and models and without plotting. Each trained model is
+    then scored over the same seeded greedy games.
+
+    Args:
+    spec: The sweep spec.
+    workers: Number of processes (default: one per CPU).
+    episodes: Greedy games used to evaluate each model.
+    sweep_dir: Directory of the sweep (default: data/sweeps/<date-time>). It
+        must be new or empty, since each run would otherwise resume the
+        checkpoints and scores an earlier sweep left in its directory.
+
+    Returns:
+    List of the results of every run, also saved to results.json in sweep_dir.
+    """
+    runs = expand_spec(spec)
+    if not runs:
+        raise ValueError("The sweep spec has no runs")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if sweep_dir is None:
+        sweep_dir = os.path.join(SWEEP_DIR, datetime.datetime.now().strftime("%Y%m%d-%H%M%S"))
+    if os.path.isdir(sweep_dir) and os.listdir(sweep_dir):
+        raise ValueError(f"The sweep directory {sweep_dir} is not empty; choose a new one with --out")
+    os.makedirs(sweep_dir, exist_ok=True)
+    with open(os.path.join(sweep_dir, "spec.json"), 'w') as f:
+        json.dump(spec, f, indent=2)
+
+    base = spec.get("base", {})
+    seed = spec.get("seed", 0)
+    jobs = [(i, run, base, sweep_dir, spec.get("tabular", False), episodes, seed) for i, run in enumerate(runs)]
+    print(f"Sweep of {len(jobs)} runs on {workers} workers in {sweep_dir}")
+
+    results = []
+    # One process per run (maxtasksperchild=1), so no run inherits state left over by the previous one
+    with spawn_context().Pool(min(workers, len(jobs)), maxtasksperchild=1) as pool:
+        for result in pool.imap_unordered(_run, jobs):
+            results.append(result)
+            status = result.get('error') or f"eval mean {result['eval']['score']['mean']:.2f}"
+            print(f"Run {result['run']} done ({len(results)}/{len(jobs)}): {result['params']} - {status}")
+
+    results.sort(key=lambda r: r['run'])
+    with open(os.path.join(sweep_dir, "results.json"), 'w') as f:
+        json.dump(results, f, indent=2)
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train many configurations in parallel and compare them")
+    parser.add_argument('spec', help="JSON sweep spec (see expand_spec)")
+    parser.add_argument('--workers', type=int, help="number of processes (default: one per CPU)")
+    parser.add_argument('--episodes', type=int, default=EVAL_EPISODES,
+                        help="greedy games used to evaluate each trained model")
+    parser.add_argument('--out', metavar='DIR', help="sweep directory (default: data/sweeps/<date-time>)")
+    args = parser.parse_args()
+
+    with open(args.spec, 'r') as f:
+        spec = json.load(f)
+    try:
+        results = run_sweep(spec, workers=args.workers, episodes=args.episodes, sweep_dir=args.out)
+    except ValueError as e:
+        sys.exit(str(e))
+    print()
+    print(format_table(results))
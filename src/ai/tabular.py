@@ -0,0 +1,139 @@
+import os
+import numpy as np
+from src.ai.agent import Agent, CHECKPOINT_DIR, MODEL_DIR, TABLE_LR
+from src.ai.features import N_CODES, pack_state, pack_states
+
+# The training state and replay memory files have the same names as the DQN's, so tabular runs resume from their own folder
+TABULAR_CHECKPOINT_DIR = os.path.join(CHECKPOINT_DIR, "tabular")
+
+# TrainConfig fields that only concern the network, and that a table ignores
+NETWORK_SETTINGS = ("lr", "hidden_size", "target_sync", "tau", "double", "background_learner")
+
+class QTable:
+    """
+    Exact Q-values for every (state, action) pair of the 11-feature state.
+    There are only 2048 x 3 of them, so a dense array replaces the network.
+
+    Offers the parts of the Linear_QNet / QTrainer interface the agent uses:
+    train_step() for updates and save() for snapshots.
+    """
+
+    def __init__(self, lr=TABLE_LR, gamma=0.9):
+        """
+        Args:
+        - lr (float): Fraction of the TD error applied per update.
+        - gamma (float): Discount factor for future rewards.
+        """
+        self.lr = lr
+        self.gamma = gamma
+        self.q_values = np.zeros((N_CODES, 3), dtype=np.float64)
+
+    def action(self, code):
+        """
+        Returns the index of the best action for a state code.
+        """
+        return int(self.q_values[code].argmax())
+
+    def train_step(self, state, action, reward, next_state, done, weights=None):
+        """
+        Moves the Q-values of a batch of transitions towards their Bellman targets.
+        Takes the same inputs as QTrainer.train_step. Transitions that share a
+        (state, action) pair are averaged, so one batch moves each entry at most
+        lr of the way to its mean target, however often the pair was drawn.
+
+        Args:
+        - state (array-like): State vector(s).
+        - action (array-like): Action(s) taken, one-hot or as indices.
+        - reward (array-like): Reward(s) received.
+        - next_state (array-like): Next state vector(s).
+        - done (array-like): Whether the episode ended.
+        - weights (array-like, optional): Importance-sampling weight of each transition.
+
+        Returns:
+        - np.ndarray: TD error of each transition before the update.
+        """
+        state = np.asarray(state)
+        action = np.asarray(action)
+        if action.ndim == state.ndim:  # One-hot actions
+            action = action.argmax(axis=-1)
+        codes = pack_states(np.atleast_2d(state)).astype(np.int64)
+        next_codes = pack_states(np.atleast_2d(next_state)).astype(np.int64)
+        action = np.atleast_1d(action).astype(np.int64)
+        reward = np.atleast_1d(np.asarray(reward, dtype=np.float64))
+        done = np.atleast_1d(np.asarray(done, dtype=bool))
+
+        next_q = self.q_values[next_codes].max(axis=1)
+        target = np.where(done, reward, reward + self.gamma * next_q)
+        td_errors = target - self.q_values[codes, action]
+
+        # Average the (weighted) TD error of every pair in the batch
+        pairs = codes * 3 + action
+        step = td_errors if weights is None else td_errors * np.asarray(weights, dtype=np.float64).reshape(-1)
+        total = np.bincount(pairs, weights=step, minlength=N_CODES * 3)
+        count = np.bincount(pairs, minlength=N_CODES * 3)
+        touched = count > 0
+        flat = self.q_values.reshape(-1)
+        flat[touched] += self.lr * total[touched] / count[touched]
+
+        return td_errors
+
+    def save(self, file_name='qtable.npz', model_folder_path='./data/models'):
+        """
+        Save the table to the model folder.
+
+        Args:
+        - file_name (str): Name of the file where the table will be saved.
+        - model_folder_path (str): Directory to save the table in.
+        """
+        if not os.path.exists(model_folder_path):
+            os.makedirs(model_folder_path)  # Create the directory if it doesn't exist
+        self.save_to(os.path.join(model_folder_path, file_name))
+
+    def save_to(self, file_name):
+        """
+        Writes the table to the given .npz path.
+        """
+        np.savez(file_name, q_values=self.q_values)
+
+    def load(self, file_name):
+        """
+        Reads a table written by save() or save_to().
+        """
+        with np.load(file_name) as data:
+            self.q_values = data['q_values'].astype(np.float64)
+
+class TabularAgent(Agent):
+    """
+    Q-learning agent that keeps its values in a QTable instead of a network.
+    Plays, remembers and trains through the same interface as Agent, with
+    its own checkpoints in data/checkpoints/tabular.
+    """
+    MODEL_FILE = "checkpoint_qtable.npz"
+    COMPLETED_FILE = "completed_qtable.npz"
+
+    def __init__(self, config=None, checkpoint_dir=TABULAR_CHECKPOINT_DIR, model_dir=MODEL_DIR):
+        """
+        Args:
+        - config (TrainConfig): Training settings; the table steps by table_lr,
+          and lr, hidden_size and the target network options do not apply to it.
+        - checkpoint_dir (str): Directory the training state is loaded from and saved to.
+        - model_dir (str): Directory the record and snapshot tables are saved to.
+        """
+        super().__init__(config=config, checkpoint_dir=checkpoint_dir, model_dir=model_dir)
+
+    def _build_model(self):
+        """Creates the table, which also does its own training."""
+        self.model = QTable(lr=self.config.table_lr, gamma=self.gamma)
+        self.trainer = self.model
+
+    def _load_model(self, file_name):
+        self.model.load(file_name)
+
+    def _save_model(self, file_name):
+        self.model.save_to(file_name)
+
+    def best_action(self, state):
+        """
+        Returns the index of the action with the highest Q-value in the table.
+        """
+        return self.model.action(pack_state(state))
@@ -1,33 +1,19 @@
-import torch
 import pygame
 from src.game.snake_ai import SnakeGameAI
-from src.ai.model import Linear_QNet
-from src.ai.agent import Agent
+from src.ai.policy import load_policy
 
 def watch_ai_play():
     """Launches the AI-controlled Snake game using the pre-trained model."""
-    # Load the trained model
-    model = Linear_QNet(11, 256, 3)
-    try:
-        model.load_state_dict(torch.load("data/models/model.pth"))
-        model.eval()
-    except FileNotFoundError:
-        print("Error: Pre-trained model file not found. Using a fresh model.")
-        # Continue with untrained model
+    # Load the trained model's greedy policy (cached, and rebuilt automatically if the model changed)
+    policy = load_policy()
 
     # Initialize the AI game with 1280x720 resolution
     game = SnakeGameAI(width=1280, height=720)  # Set the resolution explicitly
-    agent = Agent()
-    agent.model = model  # Use the loaded model
-    agent.epsilon = 0  # Disable exploration for display (always exploit)
 
     # Loop until game over
     while True:
-        # Get the current state of the game
-        state_old = agent.get_state(game)
-
-        # Use the model to decide the next move
-        final_move = agent.get_action(state_old)
+        # Look up the model's greedy move for the current state
+        final_move = policy.act(game)
 
         # Perform the action and observe the result
         reward, done, score = game.play_step(final_move)
@@ -38,4 +24,4 @@ def watch_ai_play():
             break
     
     # Ensure the display is still available for the main menu
-    pygame.display.set_mode((1280, 720))
\ No newline at end of file
+    pygame.display.set_mode((1280, 720))
@@ -0,0 +1,125 @@
+from src.game.snake_core import TURN, RIGHT, LEFT, UP, DOWN
+
+class Bitboard:
+    """
+    Whole-board masks for a cols x rows board stored in Python ints.
+    Bit c of a mask is cell c (y * cols + x), so the default 32x24 board
+    fits in one 768-bit integer and a query over every cell is a handful
+    of shifts and ANDs.
+
+    Shifts wrap around the board edges like the snake does (the board is a
+    torus), unless wrap=False is passed.
+    """
+
+    def __init__(self, cols, rows):
+        """
+        Precomputes the edge masks for the board.
+
+        Args:
+        cols: Number of cells across the board.
+        rows: Number of cells down the board.
+        """
+        self.cols = cols
+        self.rows = rows
+        self.n_cells = cols * rows
+        self.full = (1 << self.n_cells) - 1
+
+        self.first_col = 0
+        for y in range(rows):
+            self.first_col |= 1 << (y * cols)
+        self.last_col = self.first_col << (cols - 1)
+        self.first_row = (1 << cols) - 1
+        self.last_row = self.first_row << (self.n_cells - cols)
+
+    def mask(self, cells):
+        """
+        Builds a mask with the given cells set.
+        """
+        bits = 0
+        for cell in cells:
+            bits |= 1 << cell
+        return bits
+
+    def shift(self, bits, direction, wrap=True):
+        """
+        Moves every set cell one step in the given direction.
+
+        Args:
+        bits: The mask to move.
+        direction: RIGHT, LEFT, UP or DOWN.
+        wrap: Carry cells over the board edge to the opposite side; otherwise drop them.
+
+        Returns:
+        The shifted mask.
+        """
+        if direction == RIGHT:
+            moved = (bits & ~self.last_col) << 1
+            if wrap:
+                moved |= (bits & self.last_col) >> (self.cols - 1)
+        elif direction == LEFT:
+            moved = (bits & ~self.first_col) >> 1
+            if wrap:
+                moved |= (bits & self.first_col) << (self.cols - 1)
+        elif direction == DOWN:
+            moved = (bits & ~self.last_row) << self.cols
+            if wrap:
+                moved |= (bits & self.last_row) >> (self.n_cells - self.cols)
+        else:  # UP
+            moved = (bits & ~self.first_row) >> self.cols
+            if wrap:
+                moved |= (bits & self.first_row) << (self.n_cells - self.cols)
+        return moved
+
+    def neighbours(self, bits, wrap=True):
+        """
+        Returns every cell next to a set cell (the set cells themselves excluded
+        unless they neighbour one another).
+        """
+        return (self.shift(bits, RIGHT, wrap) | self.shift(bits, LEFT, wrap)
+                | self.shift(bits, UP, wrap) | self.shift(bits, DOWN, wrap))
+
+    def flood_fill(self, start, blocked):
+        """
+        Finds every cell reachable from the start cells without entering a blocked cell.
+
+        Args:
+        start: Mask of the cells to spread from.
+        blocked: Mask of the cells that cannot be entered.
+
+        Returns:
+        Mask of the reachable cells, including the start cells.
+        """
+        open_cells = self.full & ~blocked
+        reached = start
+        while True:
+            grown = reached | (self.neighbours(reached) & open_cells)
+            if grown == reached:
+                return reached
+            reached = grown
+
+    def danger(self, body, head, direction):
+        """
+        Computes the three danger features of Agent.get_state from masks.
+        Like get_state, nothing is looked up across the board edge.
+
+        Args:
+        body: Mask of the snake's body (the head bit is ignored).
+        head: Cell of the snake's head.
+        direction: Current movement direction.
+
+        Returns:
+        Tuple of booleans: danger straight, danger right, danger left.
+        """
+        head_bit = 1 << head
+        body &= ~head_bit
+        return tuple(
+            self.shift(head_bit, side, wrap=False) & body != 0
+            for side in TURN[direction]  # Straight, right, left
+        )
+
+    @staticmethod
+    def count(bits):
+        """
+        Returns the number of set cells.
+        """
+        return bits.bit_count()
@@ -2,9 +2,7 @@ import pygame
 import random
 import os
 import json
-import torch
-from src.ai.model import Linear_QNet
-from src.ai.agent import Agent
+from src.ai.policy import load_policy
 from src.game.snake_game import SnakeGame, Point, RIGHT, LEFT, UP, DOWN, BLOCK_SIZE, SPEED
 from src.game.snake_ai import SnakeGameAI
 from src.game.customization import customization
@@ -57,7 +55,8 @@ class VSPlayerGame(SnakeGame):
             
         # Move the snake in the current direction
         self._move(self.direction)
-        self.snake.insert(0, self.head)
+        self.snake.appendleft(self.head)
+        self.grid.add(self.grid.cell(self.head))
 
         # Check for collisions
         if self._is_collision():
@@ -77,7 +76,7 @@ class VSPlayerGame(SnakeGame):
                 if hasattr(self, 'level_up_sound') and self.level_up_sound:
                     self.level_up_sound.play()
         else:
-            self.snake.pop()
+            self.grid.remove(self.grid.cell(self.snake.pop()))
             
             # Update food color if it's a rainbow theme
             if self.food_theme.random_colors and self.frame_iteration % 60 == 0:
@@ -102,9 +101,10 @@ class VSPlayerGame(SnakeGame):
             pygame.draw.rect(self.display, segment_color, pygame.Rect(point.x, point.y, BLOCK_SIZE, BLOCK_SIZE))
 
         # Draw food with custom theme
-        food_color = self.food_theme.get_food_color(self.frame_iteration)
-        pygame.draw.circle(self.display, food_color, 
-                         (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
+        if self.food is not None:  # No food once the board is full
+            food_color = self.food_theme.get_food_color(self.frame_iteration)
+            pygame.draw.circle(self.display, food_color, 
+                             (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
 
 # Create a special SnakeGameAI subclass for VS mode
 class VSAIGame(SnakeGameAI):
@@ -122,14 +122,17 @@ class VSAIGame(SnakeGameAI):
             self.display.fill((240, 240, 240))  # Very light gray
 
         # Draw snake with custom theme
-        for i, point in enumerate(self.snake):
+        for i, cell in enumerate(self.snake):
+            point = self.to_pixels(cell)
             segment_color = self.snake_theme.get_segment_color(i)
             pygame.draw.rect(self.display, segment_color, pygame.Rect(point.x, point.y, BLOCK_SIZE, BLOCK_SIZE))
 
         # Draw food with custom theme
-        food_color = self.food_theme.get_food_color(self.frame_iteration)
-        pygame.draw.circle(self.display, food_color, 
-                         (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
+        if self.food is not None:  # No food once the board is full
+            food = self.to_pixels(self.food)
+            food_color = self.food_theme.get_food_color(self.frame_iteration)
+            pygame.draw.circle(self.display, food_color, 
+                             (food.x + BLOCK_SIZE // 2, food.y + BLOCK_SIZE // 2), 10)
 
 # For high score handling
 def load_high_scores():
@@ -323,33 +326,12 @@ def player_vs_ai():
         game_over_sound = None
         level_up_sound = None
     
-    # Setup AI agent model
-    model = Linear_QNet(11, 256, 3)
-    
-    # Try multiple model loading paths with better error handling
+    # Setup AI policy: the model's greedy action for every state, looked up each move
     try:
-        model_paths = ["data/models/model.pth", "model_snapshots/model.pth", 
-                      "data/checkpoints/checkpoint_model.pth"]
-        model_loaded = False
-        
-        for path in model_paths:
-            if os.path.exists(path):
-                model.load_state_dict(torch.load(path))
-                model_loaded = True
-                print(f"Model loaded successfully from {path}")
-                break
-                
-        if not model_loaded:
-            print("Warning: No pre-trained model found. Using untrained model.")
-        
-        model.eval()  # Set model to evaluation mode
+        policy = load_policy()  # Shared with the other modes, reloaded only if the model changed
     except Exception as e:
         print(f"Error loading model: {e}")
-    
-    # Initialize agent with model
-    agent = Agent()
-    agent.model = model
-    agent.epsilon = 0  # No exploration, pure exploitation
+        policy = load_policy(model_paths=[])  # Untrained model
     
     # 3) Synchronize random seed for fair food placement
     seed = random.randint(1, 10000)  # Generate a random seed
@@ -371,9 +353,10 @@ def player_vs_ai():
                 pygame.draw.rect(self.display, segment_color, pygame.Rect(point.x, point.y, BLOCK_SIZE, BLOCK_SIZE))
     
             # Draw food with custom theme
-            food_color = self.food_theme.get_food_color(self.frame_iteration)
-            pygame.draw.circle(self.display, food_color, 
-                             (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
+            if self.food is not None:  # No food once the board is full
+                food_color = self.food_theme.get_food_color(self.frame_iteration)
+                pygame.draw.circle(self.display, food_color, 
+                                 (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
             # No pygame.display.flip() call here
     
     class VSAIGameNoFlip(VSAIGame):
@@ -386,14 +369,17 @@ def player_vs_ai():
                 self.display.fill((240, 240, 240))  # Very light gray
     
             # Draw snake with custom theme
-            for i, point in enumerate(self.snake):
+            for i, cell in enumerate(self.snake):
+                point = self.to_pixels(cell)
                 segment_color = self.snake_theme.get_segment_color(i)
                 pygame.draw.rect(self.display, segment_color, pygame.Rect(point.x, point.y, BLOCK_SIZE, BLOCK_SIZE))
     
             # Draw food with custom theme
-            food_color = self.food_theme.get_food_color(self.frame_iteration)
-            pygame.draw.circle(self.display, food_color, 
-                             (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
+            if self.food is not None:  # No food once the board is full
+                food = self.to_pixels(self.food)
+                food_color = self.food_theme.get_food_color(self.frame_iteration)
+                pygame.draw.circle(self.display, food_color, 
+                                 (food.x + BLOCK_SIZE // 2, food.y + BLOCK_SIZE // 2), 10)
             # No pygame.display.flip() call here
     
     # Create permanent UI elements with more elements pre-rendered
@@ -780,9 +766,8 @@ def player_vs_ai():
             # Save previous score to check for level up
             prev_ai_score = ai_score
             
-            # Get AI state and action
-            state = agent.get_state(ai_game)
-            action = agent.get_action(state)
+            # Get AI action
+            action = policy.act(ai_game)  # Greedy action from the policy table
             
             # Process AI game step
             _, ai_game_over, ai_score = ai_game.play_step(action)
@@ -1,9 +1,8 @@
-import pygame, random, os
+import pygame, os
 from enum import Enum
-from collections import namedtuple
-import numpy as np
 from utils import draw_gradient
 from src.game.customization import customization
+from src.game.snake_core import SnakeGameCore, Point, BLOCK_SIZE, RIGHT, LEFT, UP, DOWN
 
 pygame.init()
 pygame.mixer.init()
@@ -17,27 +16,17 @@ BLACK = (0, 0, 0)
 GREEN = (0, 255, 0)
 YELLOW = (255, 255, 0)  # Add this line to define the missing YELLOW constant
 
-# Define block size and game speed
-BLOCK_SIZE = 20
+# Define game speed
 SPEED = 30  # Standardized speed
 
-# Direction constants
-RIGHT = 1
-LEFT = 2
-UP = 3
-DOWN = 4
-
-# Point data structure to store x, y coordinates
-Point = namedtuple('Point', 'x, y')
-
 # Load font for displaying text
 font_path = "assets/fonts/game_over.ttf"
 font = pygame.font.Font(font_path, 60)
 
-class SnakeGameAI:
+class SnakeGameAI(SnakeGameCore):
     """
     A class to represent the Snake Game with AI integration.
-    Handles game logic, rendering, and user interactions.
+    Renders the game core and handles sounds and user interactions.
     """
 
     def __init__(self, width=640, height=480, record=0, avg=0, iteration=0, display_surface=None):
@@ -51,8 +40,6 @@ class SnakeGameAI:
         avg: Average score.
         iteration: Current training iteration.
         """
-        self.width = width
-        self.height = height
         self.record = record
         self.avg = avg
         self.iteration = iteration
@@ -73,9 +60,6 @@ class SnakeGameAI:
         self.snake_color = self.snake_theme.head_color
         self.background_theme = "dark"  # Default background theme
         
-        self.frame_limit_multiplier = 500  # Increased frame limit - customizable parameter
-        self.recent_positions = []  # Track recent positions to detect loops
-        self.loop_detection_length = 20  # How many recent positions to check for loops
         self.debug_mode = False  # Add debug mode flag
         self.viewing_mode = False  # Add a new flag to indicate if we're in viewing mode (spectating AI)
         self.enhanced_effects = True  # Default to enhanced effects
@@ -99,35 +83,17 @@ class SnakeGameAI:
             self.sub_font = pygame.font.SysFont("Arial", 48)
             self.small_font = pygame.font.SysFont("Arial", 36)
 
-        self.reset()
-
-    def reset(self):
-        """
-        Resets the game state for a new game or iteration.
-        """
-        self.direction = RIGHT
-        self.head = Point(self.width/2, self.height/2)  # Start snake at center
-        self.snake = [self.head]  # Initialize the snake
-        self.score = 0
-        self.food = None
-        self._place_food()
-        self.frame_iteration = 0  # Track frames for performance
+        super().__init__(width=width, height=height)
 
     def _place_food(self):
         """
-        Places food at a random location on the grid.
-        Ensures the food does not spawn on the snake.
+        Places food using the game core and refreshes the food color.
         """
-        x = random.randint(0, (self.width-BLOCK_SIZE)//BLOCK_SIZE) * BLOCK_SIZE
-        y = random.randint(0, (self.height-BLOCK_SIZE)//BLOCK_SIZE) * BLOCK_SIZE
-        self.food = Point(x, y)
-        
+        super()._place_food()
+
         # Generate a new random food color if that feature is enabled
         if self.food_theme.random_colors:
             self.food_theme.new_random_color()
-            
-        if self.food in self.snake:  # Prevent food spawning on the snake
-            self._place_food()
 
     def play_step(self, action):
         """
@@ -141,8 +107,6 @@ class SnakeGameAI:
         game_over: Boolean indicating if the game is over.
         score: Current score.
         """
-        self.frame_iteration += 1
-        
         # Consolidated event handling
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -172,42 +136,21 @@ class SnakeGameAI:
                                 pygame.quit()
                                 quit()
 
-        # Move the snake
-        self._move(action) 
-        self.snake.insert(0, self.head)  # Update the snake's position
-        
-        # Keep track of recent head positions for loop detection
-        self.recent_positions.append((self.head.x, self.head.y))
-        if len(self.recent_positions) > self.loop_detection_length:
-            self.recent_positions.pop(0)
-        
-        reward = 0
-        game_over = False
+        # Advance the game core
+        prev_score = self.score
+        reward, game_over, score = super().play_step(action)
 
-        # Check for collisions - adding debug information
-        if self.is_collision():
-            game_over = True
-            reward = -10
-            self.game_over_sound.play()
-            print(f"AI Game Over: Collision detected")
-            return reward, game_over, self.score
-        
-        # Check for timeout - using customizable frame limit multiplier
-        # Only applies this strict timeout if the snake is not growing
-        # when it has score > 10 (established snake)
-        if self.score > 10 and self.frame_iteration > self.frame_limit_multiplier * len(self.snake):
-            game_over = True
-            reward = -10
-            print(f"AI Game Over: Frame limit exceeded ({self.frame_iteration} > {self.frame_limit_multiplier * len(self.snake)})")
-            return reward, game_over, self.score
+        if game_over:
+            if self.death_cause == "collision":
+                self.game_over_sound.play()
+                print(f"AI Game Over: Collision detected")
+            else:
+                print(f"AI Game Over: Frame limit exceeded ({self.frame_iteration} > {self.frame_limit_multiplier * len(self.snake)})")
+            return reward, game_over, score
 
-        # Check if the snake eats food
-        if self.head == self.food:
-            self.score += 1
-            reward = 10
-            self._place_food()
+        if self.score > prev_score:
             self.eat_sound.play()
-            
+
             # Play level up sound every 10 points
             if self.score % 10 == 0 and self.score > 0 and reward > 0:
                 if hasattr(self, 'level_up_sound') and self.level_up_sound:
@@ -215,46 +158,11 @@ class SnakeGameAI:
                     # Also show a level up message if in viewing mode
                     if self.viewing_mode:
                         self._show_level_up()
-            
-            # Reset frame iteration when food is eaten to prevent timeout
-            self.frame_iteration = 0
-        else:
-            self.snake.pop()
-            
-            # Calculate distance-based reward to guide the AI toward food
-            # Only calculate if we have at least 2 positions in the history
-            if len(self.recent_positions) >= 2:
-                prev_distance = abs(self.recent_positions[-2][0] - self.food.x) + abs(self.recent_positions[-2][1] - self.food.y)
-                curr_distance = abs(self.head.x - self.food.x) + abs(self.head.y - self.food.y)
-                
-                # Reward moving closer to food, penalize moving away
-                if curr_distance < prev_distance:
-                    reward = 0.1  # Small positive reward for moving closer to food
-                else:
-                    reward = -0.1  # Small negative reward for moving away from food
 
         # Update the display
         self._update_ui()
         self.clock.tick(SPEED)
-        return reward, game_over, self.score
-
-    def is_collision(self, pt=None):
-        """
-        Checks if the snake collides with itself.
-
-        Args:
-        pt: The point to check for collision (default: snake head).
-
-        Returns:
-        Boolean indicating if a collision occurred.
-        """
-        if pt is None:
-            pt = self.head
-        if pt in self.snake[1:]:  # Collision with the snake's body
-            self.game_over_sound.play()
-            return True
-
-        return False
+        return reward, game_over, score
 
     def _update_ui(self):
         """
@@ -276,15 +184,18 @@ class SnakeGameAI:
             controls_color = (80, 80, 80)  # Dark gray
             secondary_text_color = (100, 100, 100)  # Medium gray for secondary text
 
-        # Draw the snake with custom theme
-        for i, point in enumerate(self.snake):
+        # Draw the snake with custom theme (cells are mapped to pixels only here)
+        for i, cell in enumerate(self.snake):
+            point = self.to_pixels(cell)
             segment_color = self.snake_theme.get_segment_color(i)
             pygame.draw.rect(self.display, segment_color, pygame.Rect(point.x, point.y, BLOCK_SIZE, BLOCK_SIZE))
 
         # Draw the food with custom theme
-        food_color = self.food_theme.get_food_color(self.frame_iteration)
-        pygame.draw.circle(self.display, food_color, 
-                          (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
+        food = self.to_pixels(self.food) if self.food is not None else None  # No food once the board is full
+        if food is not None:
+            food_color = self.food_theme.get_food_color(self.frame_iteration)
+            pygame.draw.circle(self.display, food_color, 
+                              (food.x + BLOCK_SIZE // 2, food.y + BLOCK_SIZE // 2), 10)
 
         # Different UI for viewer mode vs training mode
         if self.viewing_mode:
@@ -324,52 +235,12 @@ class SnakeGameAI:
             self.display.blit(debug_text, [0, 120])  # Positioned below other UI elements
             
             # Mark the target food with a flashing indicator
-            if self.frame_iteration % 30 < 15:  # Flashing effect
+            if food is not None and self.frame_iteration % 30 < 15:  # Flashing effect
                 pygame.draw.circle(self.display, (255, 255, 0), 
-                                  (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 20, 2)
+                                  (food.x + BLOCK_SIZE // 2, food.y + BLOCK_SIZE // 2), 20, 2)
 
         pygame.display.flip()
 
-    def _move(self, action):
-        """
-        Moves the snake based on the given action.
-
-        Args:
-        action: The action taken by the AI (array: [straight, right turn, left turn]).
-        """
-        clock_wise = [RIGHT, DOWN, LEFT, UP]
-        idx = clock_wise.index(self.direction)
-
-        if np.array_equal(action, [1, 0, 0]):  # No change in direction
-            new_dir = clock_wise[idx]
-        elif np.array_equal(action, [0, 1, 0]):  # Turn right
-            next_idx = (idx + 1) % 4
-            new_dir = clock_wise[next_idx]
-        else:  # Turn left ([0, 0, 1])
-            next_idx = (idx - 1) % 4
-            new_dir = clock_wise[next_idx]
-
-        self.direction = new_dir
-
-        # Update the head's position
-        x = self.head.x
-        y = self.head.y
-
-        if self.direction == RIGHT:
-            x += BLOCK_SIZE
-        elif self.direction == LEFT:
-            x -= BLOCK_SIZE
-        elif self.direction == DOWN:
-            y += BLOCK_SIZE
-        elif self.direction == UP:
-            y -= BLOCK_SIZE
-
-        # Handle wrapping around the screen
-        x %= self.width
-        y %= self.height
-
-        self.head = Point(x, y)
-
     def set_theme(self, theme):
         """
         Updates the background theme.
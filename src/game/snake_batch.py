@@ -0,0 +1,189 @@
+import numpy as np
+from src.game.snake_core import BLOCK_SIZE, TURN, RIGHT, neighbour_table
+
+# The core's turn table as an array: TURN_TABLE[direction, action] -> new direction
+TURN_TABLE = np.array([(0, 0, 0)] + list(TURN[1:]), dtype=np.int64)
+
+def _neighbour_array(cols, rows, wrap):
+    """
+    Converts a neighbour_table into a (5, n_cells) array indexed by
+    [direction, cell], with -1 for neighbours across the board edge.
+    """
+    table = neighbour_table(cols, rows, wrap)
+    lookup = [[-1] * (cols * rows)]  # Direction 0 is unused
+    lookup += [[-1 if cell is None else cell for cell in table[direction]] for direction in (1, 2, 3, 4)]
+    return np.array(lookup, dtype=np.int64)
+
+class BatchSnakeEnv:
+    """
+    Steps many independent AI Snake boards at once with NumPy.
+    Follows the same rules and rewards as SnakeGameCore: wrap-around
+    movement, self-collision, the frame_limit_multiplier * len(snake) timeout
+    once the score is above 10, +10 for food and +/-0.1 for moving towards or
+    away from it. Finished boards are reset automatically.
+
+    All positions are packed cells (y * cols + x), as in SnakeGameCore.
+    """
+
+    def __init__(self, n_envs, width=640, height=480, frame_limit_multiplier=500, seed=None):
+        """
+        Creates the boards and starts a game on each of them.
+
+        Args:
+        n_envs: Number of boards to simulate.
+        width: Width of each board in pixels.
+        height: Height of each board in pixels.
+        frame_limit_multiplier: Frames allowed per snake segment before a timeout.
+        seed: Seed for the food placement generator.
+        """
+        self.n_envs = n_envs
+        self.width = width
+        self.height = height
+        self.cols = width // BLOCK_SIZE
+        self.rows = height // BLOCK_SIZE
+        self.n_cells = self.cols * self.rows
+        self.frame_limit_multiplier = frame_limit_multiplier
+        self.rng = np.random.default_rng(seed)
+        self.neighbours = _neighbour_array(self.cols, self.rows, wrap=True)
+        self.inner_neighbours = _neighbour_array(self.cols, self.rows, wrap=False)
+
+        # Each body is a ring buffer; head_slot points at the head and the
+        # tail sits length - 1 slots behind it
+        self.capacity = self.n_cells + 1
+        self.body = np.zeros((n_envs, self.capacity), dtype=np.int64)
+        self.head_slot = np.zeros(n_envs, dtype=np.int64)
+        self.length = np.zeros(n_envs, dtype=np.int64)
+        self.occupancy = np.zeros((n_envs, self.n_cells), dtype=np.uint8)
+
+        self.head = np.zeros(n_envs, dtype=np.int64)
+        self.direction = np.zeros(n_envs, dtype=np.int64)
+        self.food = np.zeros(n_envs, dtype=np.int64)  # -1 once a board is full
+        self.score = np.zeros(n_envs, dtype=np.int64)
+        self.frame_iteration = np.zeros(n_envs, dtype=np.int64)
+
+        # Previous head for the distance reward. Like SnakeGameCore's
+        # recent_positions it carries over between games, and is -1 until
+        # the first move has been made.
+        self.prev_head = np.full(n_envs, -1, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self, envs=None):
+        """
+        Starts a new game on the given boards.
+
+        Args:
+        envs: Indices or boolean mask of the boards to reset (default: all).
+        """
+        if envs is None:
+            envs = np.arange(self.n_envs)
+        envs = np.asarray(envs)
+        if envs.dtype == bool:
+            envs = np.flatnonzero(envs)
+        if len(envs) == 0:
+            return
+
+        start = (self.rows // 2) * self.cols + self.cols // 2  # Start snake at center
+        self.occupancy[envs] = 0
+        self.occupancy[envs, start] = 1
+        self.head_slot[envs] = 0
+        self.body[envs, 0] = start
+        self.length[envs] = 1
+        self.head[envs] = start
+        self.direction[envs] = RIGHT
+        self.score[envs] = 0
+        self.frame_iteration[envs] = 0
+        self._place_food(envs)
+
+    def _place_food(self, envs):
+        """
+        Places food on a uniformly random empty cell of each given board.
+
+        Args:
+        envs: Indices of the boards that need new food.
+        """
+        # Give every empty cell a random key and take the largest one
+        keys = self.rng.random((len(envs), self.n_cells))
+        occupied = self.occupancy[envs] > 0
+        keys[occupied] = -1.0
+        food = keys.argmax(axis=1)
+        food[occupied.all(axis=1)] = -1  # No food once the board is full
+        self.food[envs] = food
+
+    def step(self, actions):
+        """
+        Advances every board by one move.
+
+        Args:
+        actions: Action index per board (0 straight, 1 right turn, 2 left turn),
+            or one-hot actions of shape (n_envs, 3).
+
+        Returns:
+        rewards: Reward for each board.
+        dones: Boolean mask of the boards whose game ended (already reset).
+        scores: Score of each board at the end of the move, before any reset.
+        """
+        actions = np.asarray(actions)
+        if actions.ndim == 2:
+            actions = actions.argmax(axis=1)
+        envs = np.arange(self.n_envs)
+
+        self.frame_iteration += 1
+
+        # Turn and move the head, wrapping around the board edges
+        self.direction = TURN_TABLE[self.direction, actions]
+        prev_head = self.prev_head
+        self.head = self.neighbours[self.direction, self.head]
+        self.prev_head = self.head.copy()
+
+        rewards = np.zeros(self.n_envs, dtype=np.float64)
+
+        # The old tail still counts, as it has not moved out of the way yet
+        collision = self.occupancy[envs, self.head] > 0
+        timeout = (~collision & (self.score > 10)
+                   & (self.frame_iteration > self.frame_limit_multiplier * (self.length + 1)))
+        dones = collision | timeout
+        rewards[dones] = -10
+
+        # Push the new head on every board that is still playing
+        alive = np.flatnonzero(~dones)
+        self.head_slot[alive] = (self.head_slot[alive] + 1) % self.capacity
+        self.body[alive, self.head_slot[alive]] = self.head[alive]
+        self.occupancy[alive, self.head[alive]] += 1
+
+        # Boards that ate grow and get new food
+        eats = self.head[alive] == self.food[alive]
+        ate = alive[eats]
+        self.score[ate] += 1
+        self.length[ate] += 1
+        self.frame_iteration[ate] = 0
+        rewards[ate] = 10
+        if len(ate):
+            self._place_food(ate)
+
+        # The others drop their tail and are rewarded for approaching the food
+        moved = alive[~eats]
+        tail_slot = (self.head_slot[moved] - self.length[moved]) % self.capacity
+        self.occupancy[moved, self.body[moved, tail_slot]] -= 1
+
+        food_x, food_y = self.food[moved] % self.cols, self.food[moved] // self.cols
+        prev = prev_head[moved]
+        prev_distance = np.abs(prev % self.cols - food_x) + np.abs(prev // self.cols - food_y)
+        curr_distance = (np.abs(self.head[moved] % self.cols - food_x)
+                         + np.abs(self.head[moved] // self.cols - food_y))
+        rewards[moved] = np.where(curr_distance < prev_distance, 0.1, -0.1)
+        rewards[moved[prev < 0]] = 0
+
+        scores = self.score.copy()
+        self.reset(dones)
+        return rewards, dones, scores
+
+    def snake(self, env):
+        """
+        Returns the body of one board as a list of cells, head first.
+
+        Args:
+        env: Index of the board.
+        """
+        slots = (self.head_slot[env] - np.arange(self.length[env])) % self.capacity
+        return self.body[env, slots].tolist()
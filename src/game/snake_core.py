@@ -0,0 +1,467 @@
+import random
+from array import array
+from collections import namedtuple, deque
+from functools import lru_cache
+from numbers import Integral
+
+# Define block size (pixels per grid cell)
+BLOCK_SIZE = 20
+
+# Direction constants
+RIGHT = 1
+LEFT = 2
+UP = 3
+DOWN = 4
+
+# Point data structure to store x, y coordinates
+Point = namedtuple('Point', 'x, y')
+
+# Clockwise order of the directions, used for turning
+CLOCK_WISE = (RIGHT, DOWN, LEFT, UP)
+
+# Relative actions as indices: straight, right turn, left turn
+ACTION_INDEX = {(1, 0, 0): 0, (0, 1, 0): 1, (0, 0, 1): 2}
+
+def _turn_table():
+    table = [None] * 5  # Indexed by direction constant; 0 is unused
+    for idx, direction in enumerate(CLOCK_WISE):
+        table[direction] = (direction, CLOCK_WISE[(idx + 1) % 4], CLOCK_WISE[(idx - 1) % 4])
+    return tuple(table)
+
+# TURN[direction][action] -> new direction after going straight (0), turning right (1) or left (2)
+TURN = _turn_table()
+
+@lru_cache(maxsize=None)
+def neighbour_table(cols, rows, wrap=True):
+    """
+    Builds the neighbour of every cell in every direction.
+    Tables are cached, so every game on the same board size shares them.
+
+    Args:
+    cols: Number of cells across the board.
+    rows: Number of cells down the board.
+    wrap: Wrap around the board edges like the snake does. Otherwise a
+        neighbour across the edge is None.
+
+    Returns:
+    A tuple indexed by direction constant, each a tuple of cells indexed by cell:
+    table[direction][cell] -> neighbouring cell.
+    """
+    offsets = {RIGHT: (1, 0), LEFT: (-1, 0), UP: (0, -1), DOWN: (0, 1)}
+    table = [None] * 5
+    for direction, (dx, dy) in offsets.items():
+        cells = []
+        for cell in range(cols * rows):
+            x, y = cell % cols + dx, cell // cols + dy
+            if wrap:
+                cells.append((y % rows) * cols + x % cols)
+            elif 0 <= x < cols and 0 <= y < rows:
+                cells.append(y * cols + x)
+            else:
+                cells.append(None)
+        table[direction] = tuple(cells)
+    return tuple(table)
+
+# Frozen copy of a SnakeGameCore, made of immutable bytes, tuples and ints
+GameSnapshot = namedtuple('GameSnapshot', [
+    'body', 'direction', 'food', 'score', 'frame_iteration',
+    'recent_positions', 'death_cause', 'grid', 'rng_state'
+])
+
+class SplitMix64:
+    """
+    A small random number generator whose whole state is one integer.
+    The game core uses it so that snapshots can capture the RNG for free
+    (random.Random carries 625 words of state).
+    """
+    MASK = (1 << 64) - 1
+
+    def __init__(self, seed=None):
+        """
+        Args:
+        seed: Integer seed (default: drawn from the random module, so
+            seeding the random module still makes games reproducible).
+        """
+        self.seed(seed)
+
+    def seed(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.state = seed & self.MASK
+
+    def next64(self):
+        """
+        Returns the next 64-bit output.
+        """
+        self.state = (self.state + 0x9E3779B97F4A7C15) & self.MASK
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & self.MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & self.MASK
+        return z ^ (z >> 31)
+
+    def randrange(self, n):
+        """
+        Returns a random integer in [0, n).
+        """
+        return (self.next64() * n) >> 64
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
+
+class OccupancyGrid:
+    """
+    Counts the snake segments on every cell of the board.
+    Kept in sync as segments are added and removed, so a collision query
+    costs O(1) no matter how long the snake is.
+
+    Also keeps an index of the empty cells (a swap-remove list plus the
+    position of every cell in it) so a uniformly random empty cell can be
+    drawn in O(1), however full the board is.
+    """
+
+    def __init__(self, cols, rows):
+        """
+        Creates an empty grid.
+
+        Args:
+        cols: Number of cells across the board.
+        rows: Number of cells down the board.
+        """
+        self.cols = cols
+        self.rows = rows
+        self.clear()
+
+    def cell(self, pt):
+        """
+        Converts a pixel point into a cell index.
+
+        Args:
+        pt: The point to convert.
+
+        Returns:
+        The cell index, or None if the point lies outside the board.
+        """
+        x = int(pt.x) // BLOCK_SIZE
+        y = int(pt.y) // BLOCK_SIZE
+        if pt.x < 0 or pt.y < 0 or x >= self.cols or y >= self.rows:
+            return None
+        return y * self.cols + x
+
+    def point(self, cell):
+        """
+        Converts a cell index into the pixel point of its top-left corner.
+        """
+        return Point((cell % self.cols) * BLOCK_SIZE, (cell // self.cols) * BLOCK_SIZE)
+
+    def clear(self):
+        """
+        Marks every cell as empty.
+        """
+        n_cells = self.cols * self.rows
+        self.counts = bytearray(n_cells)
+        self.free = array('i', range(n_cells))  # Empty cells, in no particular order
+        self.free_pos = array('i', range(n_cells))  # Index of each cell in self.free (-1 if occupied)
+
+    def snapshot(self):
+        """
+        Returns the grid state as immutable bytes.
+        """
+        return bytes(self.counts), self.free.tobytes(), self.free_pos.tobytes()
+
+    def restore(self, state):
+        """
+        Restores a state returned by snapshot().
+        """
+        counts, free, free_pos = state
+        self.counts = bytearray(counts)
+        self.free = array('i')
+        self.free.frombytes(free)
+        self.free_pos = array('i')
+        self.free_pos.frombytes(free_pos)
+
+    def add(self, cell):
+        """
+        Records a segment on the given cell.
+        """
+        self.counts[cell] += 1
+        if self.counts[cell] == 1:
+            # Swap the last free cell into this cell's slot and drop the tail
+            pos = self.free_pos[cell]
+            last = self.free.pop()
+            if last != cell:
+                self.free[pos] = last
+                self.free_pos[last] = pos
+            self.free_pos[cell] = -1
+
+    def remove(self, cell):
+        """
+        Removes a segment from the given cell.
+        """
+        self.counts[cell] -= 1
+        if self.counts[cell] == 0:
+            self.free_pos[cell] = len(self.free)
+            self.free.append(cell)
+
+    def random_free_cell(self, rng=random):
+        """
+        Picks a uniformly random empty cell.
+
+        Args:
+        rng: Random number generator to draw from (default: the random module).
+
+        Returns:
+        The cell index, or None if the board is full.
+        """
+        if not self.free:
+            return None
+        return self.free[rng.randrange(len(self.free))]
+
+    def count(self, cell):
+        """
+        Returns the number of segments on the given cell.
+        """
+        return self.counts[cell]
+
+class SnakeGameCore:
+    """
+    The rules of the AI Snake game without any rendering, audio or frame cap.
+    Used directly for headless training and subclassed by SnakeGameAI for display.
+
+    Positions are packed integer cells (y * cols + x) on a cols x rows board.
+    Pixels only appear when a renderer calls to_pixels().
+    """
+
+    def __init__(self, width=640, height=480, rng=None, bitboard=False):
+        """
+        Initializes the game state for the given board dimensions.
+
+        Args:
+        width: Width of the board in pixels.
+        height: Height of the board in pixels.
+        rng: Random number generator used for food placement. It needs
+            randrange(), getstate() and setstate() (default: a SplitMix64
+            seeded from the random module).
+        bitboard: Also keep the body as a Bitboard mask (body_bits) for
+            whole-board queries such as reachable_area().
+        """
+        self.width = width
+        self.height = height
+        self.cols = width // BLOCK_SIZE
+        self.rows = height // BLOCK_SIZE
+        self.rng = rng if rng is not None else SplitMix64()
+        self.grid = OccupancyGrid(self.cols, self.rows)
+        self.neighbours = neighbour_table(self.cols, self.rows)  # Wrapped, used for moving
+        self.inner_neighbours = neighbour_table(self.cols, self.rows, wrap=False)  # None across the edge
+        self.bitboard = None
+        if bitboard:
+            from src.game.bitboard import Bitboard
+            self.bitboard = Bitboard(self.cols, self.rows)
+
+        self.frame_limit_multiplier = 500  # Increased frame limit - customizable parameter
+        self.recent_positions = []  # Track recent positions to detect loops
+        self.loop_detection_length = 20  # How many recent positions to check for loops
+        self.death_cause = None  # "collision" or "timeout" once the game is over
+
+        self.reset()
+
+    def reset(self):
+        """
+        Resets the game state for a new game or iteration.
+        """
+        self.direction = RIGHT
+        self.head = (self.rows // 2) * self.cols + self.cols // 2  # Start snake at center
+        self.snake = deque([self.head])  # Initialize the snake (head first)
+        self.grid.clear()
+        self.grid.add(self.head)
+        self.body_bits = 1 << self.head
+        self.score = 0
+        self.food = None
+        self._place_food()
+        self.frame_iteration = 0  # Track frames for performance
+        self.death_cause = None
+
+    def snapshot(self):
+        """
+        Captures the game state: body, direction, food, score, frame counter
+        and RNG state. Everything is copied into immutable bytes, tuples and
+        ints, so a snapshot can be kept, shared or restored any number of times.
+
+        Returns:
+        A GameSnapshot.
+        """
+        return GameSnapshot(
+            tuple(self.snake), self.direction, self.food, self.score, self.frame_iteration,
+            tuple(self.recent_positions), self.death_cause, self.grid.snapshot(), self.rng.getstate()
+        )
+
+    def restore(self, snapshot):
+        """
+        Puts the game back into the state captured by snapshot().
+
+        Args:
+        snapshot: A GameSnapshot taken from a game with the same board size.
+        """
+        self.snake = deque(snapshot.body)
+        self.head = snapshot.body[0]
+        self.direction = snapshot.direction
+        self.food = snapshot.food
+        self.score = snapshot.score
+        self.frame_iteration = snapshot.frame_iteration
+        self.recent_positions = list(snapshot.recent_positions)
+        self.death_cause = snapshot.death_cause
+        self.grid.restore(snapshot.grid)
+        if self.bitboard is not None:
+            self.body_bits = self.bitboard.mask(snapshot.body)
+        self.rng.setstate(snapshot.rng_state)
+
+    def reachable_area(self, cell=None):
+        """
+        Counts the empty cells the snake could still reach from a cell,
+        moving around the wrapped board without crossing its body.
+        Needs the game to be created with bitboard=True.
+
+        Args:
+        cell: The cell to start from (default: snake head).
+
+        Returns:
+        Number of reachable cells, the start cell not included.
+        """
+        if cell is None:
+            cell = self.head
+        start = 1 << cell
+        reached = self.bitboard.flood_fill(start, self.body_bits & ~start)
+        return self.bitboard.count(reached & ~start)
+
+    def cell_xy(self, cell):
+        """
+        Splits a packed cell into its (x, y) grid coordinates.
+        """
+        return cell % self.cols, cell // self.cols
+
+    def to_pixels(self, cell):
+        """
+        Converts a cell into the pixel point of its top-left corner.
+        """
+        return Point((cell % self.cols) * BLOCK_SIZE, (cell // self.cols) * BLOCK_SIZE)
+
+    def _place_food(self):
+        """
+        Places food at a random location on the grid.
+        Only empty cells are drawn from, so the food never spawns on the snake.
+        The food is None once the snake fills the whole board.
+        """
+        self.food = self.grid.random_free_cell(self.rng)
+
+    def play_step(self, action):
+        """
+        Advances the game by a single move.
+
+        Args:
+        action: The action taken by the AI (array: [straight, right turn, left turn],
+            or the index of the action).
+
+        Returns:
+        reward: Reward for the current action.
+        game_over: Boolean indicating if the game is over.
+        score: Current score.
+        """
+        self.frame_iteration += 1
+
+        # Move the snake
+        self._move(action)
+        self.snake.appendleft(self.head)  # Update the snake's position
+        self.grid.add(self.head)
+        if self.bitboard is not None:
+            self.body_bits |= 1 << self.head
+
+        # Keep track of recent head positions for loop detection
+        self.recent_positions.append(self.head)
+        if len(self.recent_positions) > self.loop_detection_length:
+            self.recent_positions.pop(0)
+
+        reward = 0
+        game_over = False
+
+        # Check for collisions
+        if self.is_collision():
+            game_over = True
+            reward = -10
+            self.death_cause = "collision"
+            return reward, game_over, self.score
+
+        # Check for timeout - using customizable frame limit multiplier
+        # Only applies this strict timeout if the snake is not growing
+        # when it has score > 10 (established snake)
+        if self.score > 10 and self.frame_iteration > self.frame_limit_multiplier * len(self.snake):
+            game_over = True
+            reward = -10
+            self.death_cause = "timeout"
+            return reward, game_over, self.score
+
+        # Check if the snake eats food
+        if self.head == self.food:
+            self.score += 1
+            reward = 10
+            self._place_food()
+
+            # Reset frame iteration when food is eaten to prevent timeout
+            self.frame_iteration = 0
+        else:
+            tail = self.snake.pop()
+            self.grid.remove(tail)
+            if self.bitboard is not None:
+                self.body_bits &= ~(1 << tail)
+
+            # Calculate distance-based reward to guide the AI toward food
+            # Only calculate if we have at least 2 positions in the history
+            if len(self.recent_positions) >= 2:
+                food_x, food_y = self.cell_xy(self.food)
+                prev_x, prev_y = self.cell_xy(self.recent_positions[-2])
+                head_x, head_y = self.cell_xy(self.head)
+                prev_distance = abs(prev_x - food_x) + abs(prev_y - food_y)
+                curr_distance = abs(head_x - food_x) + abs(head_y - food_y)
+
+                # Reward moving closer to food, penalize moving away
+                if curr_distance < prev_distance:
+                    reward = 0.1  # Small positive reward for moving closer to food
+                else:
+                    reward = -0.1  # Small negative reward for moving away from food
+
+        return reward, game_over, self.score
+
+    def is_collision(self, cell=None):
+        """
+        Checks if the snake collides with itself.
+        Has no side effects, so it is safe to call from state extraction.
+
+        Args:
+        cell: The cell to check for collision (default: snake head).
+
+        Returns:
+        Boolean indicating if a collision occurred.
+        """
+        if cell is None:
+            cell = self.head
+        # The head occupies its own cell, so only further segments count
+        body_count = self.grid.count(cell) - (cell == self.head)
+        return body_count > 0  # Collision with the snake's body
+
+    def _move(self, action):
+        """
+        Moves the snake based on the given action.
+
+        Args:
+        action: The action taken by the AI, either one-hot ([straight, right turn, left turn])
+            or its index (0 straight, 1 right turn, 2 left turn). Anything that
+            is not exactly straight or right turns left.
+        """
+        if isinstance(action, Integral):
+            turn = action
+        else:
+            turn = ACTION_INDEX.get(tuple(action), 2)
+
+        self.direction = TURN[self.direction][turn]
+        self.head = self.neighbours[self.direction][self.head]  # Wraps around the board edges
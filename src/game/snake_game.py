@@ -1,8 +1,8 @@
 import pygame
-import random
 from enum import Enum
-from collections import namedtuple
+from collections import namedtuple, deque
 from src.game.customization import customization
+from src.game.snake_core import OccupancyGrid
 from utils import draw_gradient 
 import os
 import json
@@ -89,11 +89,14 @@ class SnakeGame:
         # Initialize snake position and direction
         self.direction = RIGHT
         self.head = Point(self.width // 2, self.height // 2)
-        self.snake = [
+        self.snake = deque([
             self.head,
             Point(self.head.x - BLOCK_SIZE, self.head.y),
             Point(self.head.x - (2 * BLOCK_SIZE), self.head.y)
-        ]
+        ])  # Head first; O(1) insert at the head and pop at the tail
+        self.grid = OccupancyGrid(self.width // BLOCK_SIZE, self.height // BLOCK_SIZE)
+        for point in self.snake:
+            self.grid.add(self.grid.cell(point))
         self.food = None
         self._place_food()
 
@@ -101,11 +104,9 @@ class SnakeGame:
         self.enhanced_effects = True  # Default to enhanced effects
 
     def _place_food(self):
-        x = random.randint(0, (self.width - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE 
-        y = random.randint(0, (self.height - BLOCK_SIZE) // BLOCK_SIZE) * BLOCK_SIZE
-        self.food = Point(x, y)
-        if self.food in self.snake:
-            self._place_food()
+        # Draw from the empty cells only; None once the snake fills the board
+        cell = self.grid.random_free_cell()
+        self.food = None if cell is None else self.grid.point(cell)
         
     def play_step(self):
         self.frame_iteration += 1
@@ -158,10 +159,13 @@ class SnakeGame:
 
         # Move the snake
         self._move(self.direction)
-        self.snake.insert(0, self.head)
+        self.snake.appendleft(self.head)
+        self.grid.add(self.grid.cell(self.head))
 
         # Check for collisions
         if self._is_collision():
+            self.game_over_sound.play()
+            print(f"Game Over: Snake collision")
             return True, self.score
 
         # Check if the snake eats food
@@ -178,7 +182,7 @@ class SnakeGame:
                     # Show level up animation
                     self._show_level_up()
         else:
-            self.snake.pop()
+            self.grid.remove(self.grid.cell(self.snake.pop()))
             
             # Update food color if it's a rainbow theme
             # This is the key fix - update the food color even when not eating
@@ -191,12 +195,8 @@ class SnakeGame:
         return False, self.score
     
     def _is_collision(self):
-        # Check if the snake hits itself
-        if self.head in self.snake[1:]:
-            self.game_over_sound.play()
-            print(f"Game Over: Snake collision")
-            return True
-        return False
+        # Check if the snake hits itself (the head's own cell counts once)
+        return self.grid.count(self.grid.cell(self.head)) > 1
         
     def _update_ui(self):
         # Apply background based on theme
@@ -219,9 +219,10 @@ class SnakeGame:
             pygame.draw.rect(self.display, segment_color, pygame.Rect(point.x, point.y, BLOCK_SIZE, BLOCK_SIZE))
 
         # Draw food with custom theme
-        food_color = self.food_theme.get_food_color(self.frame_iteration)
-        pygame.draw.circle(self.display, food_color, 
-                          (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
+        if self.food is not None:  # No food once the board is full
+            food_color = self.food_theme.get_food_color(self.frame_iteration)
+            pygame.draw.circle(self.display, food_color, 
+                              (self.food.x + BLOCK_SIZE // 2, self.food.y + BLOCK_SIZE // 2), 10)
 
         # Display score with consistent font and dynamic color
         score_text = self.main_font.render("Score: " + str(self.score), True, main_text_color)
@@ -1,14 +1,12 @@
 import pygame
-import torch
 import sys
 import math
 import os
 import random
 import json  
-from src.ai.model import Linear_QNet
 from src.game.snake_game import SnakeGame
 from src.game.snake_ai import SnakeGameAI
-from src.ai.agent import Agent
+from src.ai.policy import load_policy
 from src.game.player_vs_ai import get_player_position, save_player_position
 from src.game.customization import customization
 import datetime
@@ -1022,26 +1020,9 @@ def play_classic_game():
 
 def watch_ai_play():
     global snake_color, background_theme, screen, debug_mode, enhanced_effects
-    model = Linear_QNet(11, 256, 3)
-    
-    # Try multiple model loading paths with better error handling
+    # Load the model's greedy policy (shared with the other modes, reloaded only if the model changed)
     try:
-        # Look in different possible locations for the model
-        model_paths = ["data/models/model.pth", "model_snapshots/model.pth", 
-                        "data/checkpoints/checkpoint_model.pth"]
-        model_loaded = False
-        
-        for path in model_paths:
-            if os.path.exists(path):
-                model.load_state_dict(torch.load(path))
-                model_loaded = True
-                print(f"Model loaded successfully from {path}")
-                break
-                
-        if not model_loaded:
-            print("Warning: No pre-trained model found. Using untrained model.")
-        
-        model.eval()  # Set model to evaluation mode
+        policy = load_policy()
     except Exception as e:
         print(f"Error loading model: {e}")
         return
@@ -1094,15 +1075,9 @@ def watch_ai_play():
     game.frame_limit_multiplier = 1000  # Very lenient frame limit for viewing
     game.debug_mode = debug_mode  # Pass debug mode to the game
     
-    # Initialize agent with the model
-    agent = Agent()
-    agent.model = model
-    agent.epsilon = 0  # No exploration, pure exploitation
-    
     # Game loop
     while True:
-        state = agent.get_state(game)
-        move = agent.get_action(state)
+        move = policy.act(game)  # Greedy action from the policy table
         
         # Process the move
         reward, done, score = game.play_step(move)
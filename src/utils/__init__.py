@@ -1,5 +1,3 @@
-import pygame
-
 def draw_gradient(display, color1, color2, width, height):
     """
     Draws a vertical gradient on the display.
@@ -11,6 +9,9 @@ def draw_gradient(display, color1, color2, width, height):
     width: Width of the gradient area.
     height: Height of the gradient area.
     """
+    # Imported here so that headless code importing src.utils does not need pygame
+    import pygame
+
     for i in range(height):
         r = color1[0] + (color2[0] - color1[0]) * i // height
         g = color1[1] + (color2[1] - color1[1]) * i // height